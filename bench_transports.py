@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Banco de latencia de los transportes de chat
+============================================
+
+Mide la latencia de extremo a extremo de cada transporte: desde la hora
+que Twitch asigna al mensaje (``tmi-sent-ts`` en IRC,
+``message_timestamp`` en EventSub) hasta que el transporte lo entrega al
+bot. El mismo medidor sirve para ambos transportes.
+
+Modos:
+
+- Local (solo EventSub): levanta ``eventsub_local.py`` e inyecta mensajes::
+
+    python bench_transports.py --local --count 1000
+
+- Real: escucha el chat de los canales del ``.env`` durante un tiempo::
+
+    python bench_transports.py --transport irc --duration 120
+    python bench_transports.py --transport eventsub --duration 120
+
+Autor: llopgui https://github.com/llopgui/
+Fecha de creación: Junio 2025
+Licencia: CC BY-NC-SA 4.0
+Repositorio: https://github.com/llopgui/self-bot-twitch
+"""
+
+import argparse
+import asyncio
+import statistics
+from typing import List, Optional
+
+from transports import ChatMessage, EventSubTransport, IrcTransport, Transport
+
+
+class LatencyProbe:
+    """
+    Medidor de latencia que se conecta como receptor de un transporte.
+
+    Attributes:
+        latencies (List[float]): Latencias medidas en segundos
+        ready (asyncio.Event): Se activa cuando el transporte conecta
+        done (asyncio.Event): Se activa al recibir los mensajes esperados
+    """
+
+    def __init__(self, expected: Optional[int] = None):
+        """
+        Inicializa el medidor.
+
+        Args:
+            expected (Optional[int]): Mensajes a esperar antes de terminar
+        """
+        self.latencies: List[float] = []
+        self.ready = asyncio.Event()
+        self.done = asyncio.Event()
+        self._expected = expected
+
+    async def on_ready(self) -> None:
+        """Receptor del aviso de conexión del transporte."""
+        self.ready.set()
+
+    async def on_message(self, message: ChatMessage) -> None:
+        """
+        Receptor de mensajes del transporte.
+
+        Args:
+            message (ChatMessage): Mensaje recibido
+        """
+        if message.echo:
+            return
+        self.latencies.append(message.received_at - message.sent_at)
+        if self._expected is not None and len(self.latencies) >= self._expected:
+            self.done.set()
+
+    def report(self, name: str) -> str:
+        """
+        Resume las latencias medidas.
+
+        Args:
+            name (str): Nombre del transporte
+
+        Returns:
+            str: Resumen con recuento y percentiles en milisegundos
+        """
+        if not self.latencies:
+            return f"{name}: sin mensajes"
+        values = sorted(value * 1000 for value in self.latencies)
+
+        def percentile(p: float) -> float:
+            return values[min(len(values) - 1, int(p * len(values)))]
+
+        return (
+            f"{name}: n={len(values)} media={statistics.fmean(values):.2f}ms "
+            f"p50={percentile(0.50):.2f}ms p90={percentile(0.90):.2f}ms "
+            f"p99={percentile(0.99):.2f}ms max={values[-1]:.2f}ms"
+        )
+
+
+async def run_probe(
+    transport: Transport, probe: LatencyProbe, duration: float
+) -> None:
+    """
+    Ejecuta un transporte hasta que el medidor termine o pase el tiempo.
+
+    Args:
+        transport (Transport): Transporte a medir (con el medidor conectado)
+        probe (LatencyProbe): Medidor
+        duration (float): Tiempo máximo de medida en segundos
+    """
+    task = asyncio.get_running_loop().create_task(transport.run())
+    try:
+        await asyncio.wait_for(probe.done.wait(), duration)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        await transport.close()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+async def bench_local(count: int, interval: float) -> str:
+    """
+    Mide EventSub contra el servidor local inyectando mensajes.
+
+    Args:
+        count (int): Mensajes a inyectar
+        interval (float): Segundos entre mensajes
+
+    Returns:
+        str: Resumen de latencias
+    """
+    from eventsub_local import LocalEventSubServer
+
+    server = LocalEventSubServer()
+    await server.start()
+    probe = LatencyProbe(expected=count)
+    transport = EventSubTransport(
+        "oauth:local",
+        ["canal_local"],
+        probe.on_message,
+        probe.on_ready,
+        **server.urls(),
+    )
+
+    async def inject():
+        await probe.ready.wait()
+        await server.wait_subscribed("canal_local")
+        for i in range(count):
+            await server.inject("canal_local", "espectador", f"mensaje {i} plutón")
+            await asyncio.sleep(interval)
+
+    injector = asyncio.get_running_loop().create_task(inject())
+    try:
+        await run_probe(transport, probe, duration=30 + count * interval)
+    finally:
+        injector.cancel()
+        await server.close()
+    return probe.report("eventsub (local)")
+
+
+async def bench_live(transport_name: str, duration: float) -> str:
+    """
+    Mide un transporte contra Twitch con el chat real de los canales
+    configurados en el ``.env``.
+
+    Args:
+        transport_name (str): "irc" o "eventsub"
+        duration (float): Segundos de medida
+
+    Returns:
+        str: Resumen de latencias
+    """
+    import twitchio
+
+    from config import BotConfig
+
+    config = BotConfig()
+    probe = LatencyProbe()
+    if transport_name == "eventsub":
+        transport = EventSubTransport(
+            config.token,
+            config.get_channels(),
+            probe.on_message,
+            probe.on_ready,
+            ws_url=config.eventsub_ws_url,
+            api_url=config.twitch_api_url,
+            auth_url=config.twitch_auth_url,
+        )
+    else:
+        client = twitchio.Client(
+            token=config.token, initial_channels=config.get_channels()
+        )
+        transport = IrcTransport(client, probe.on_message, probe.on_ready)
+
+    await run_probe(transport, probe, duration)
+    return probe.report(f"{transport_name} (Twitch)")
+
+
+def main():
+    """Punto de entrada del banco de latencia."""
+    parser = argparse.ArgumentParser(description="Latencia de transportes de chat")
+    parser.add_argument("--local", action="store_true", help="usar el servidor local")
+    parser.add_argument("--transport", choices=["irc", "eventsub"], default="eventsub")
+    parser.add_argument("--count", type=int, default=500, help="mensajes (local)")
+    parser.add_argument("--interval", type=float, default=0.005, help="s (local)")
+    parser.add_argument("--duration", type=float, default=60, help="s (Twitch)")
+    args = parser.parse_args()
+
+    if args.local:
+        print(asyncio.run(bench_local(args.count, args.interval)))
+    else:
+        print(asyncio.run(bench_live(args.transport, args.duration)))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,12 +12,62 @@ Repositorio: https://github.com/llopgui/self-bot-twitch
 """
 
 import os
-from typing import List, Set
+from typing import Dict, List, Mapping, Optional, Set
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values, find_dotenv, load_dotenv
+
+# Archivo .env del que se lee la configuración (vacío si no existe)
+ENV_FILE = find_dotenv()
+
+# Variables de entorno del proceso antes de cargar el .env, para que al
+# recargar no se conserven valores que ya se han borrado del archivo
+_PROCESS_ENV = dict(os.environ)
 
 # Cargar variables de entorno desde el archivo .env
-load_dotenv()
+load_dotenv(ENV_FILE)
+
+# Atributos que se comparan al recargar la configuración
+_RELOAD_FIELDS = (
+    "token",
+    "nick",
+    "channels",
+    "message_interval",
+    "ignored_bots",
+    "state_file",
+    "state_snapshot_interval",
+    "reply_cooldown",
+    "pipeline_timing",
+    "pipeline_stats_interval",
+    "use_uvloop",
+    "slow_callback_ms",
+    "profiler_interval_ms",
+    "profiler_window",
+    "profiler_dir",
+    "config_watch_interval",
+    "chat_transport",
+    "eventsub_ws_url",
+    "twitch_api_url",
+    "twitch_auth_url",
+    "default_language",
+    "channel_languages",
+    "content_dir",
+)
+
+# Transportes de chat disponibles
+CHAT_TRANSPORTS = ("irc", "eventsub")
+
+
+def _parse_bool(value: str) -> bool:
+    """
+    Interpreta una variable de entorno como valor booleano.
+
+    Args:
+        value (str): Valor de la variable
+
+    Returns:
+        bool: True si el valor es afirmativo (1, true, yes, sí...)
+    """
+    return value.strip().lower() in {"1", "true", "yes", "y", "si", "sí", "on"}
 
 
 class BotConfig:
@@ -27,34 +77,123 @@ class BotConfig:
     Attributes:
         token (str): Token OAuth del bot
         nick (str): Nombre del bot
-        channel (str): Canal de Twitch al que se conecta
+        channel (str): Canal principal de Twitch (el primero de channels)
+        channels (List[str]): Canales de Twitch a los que se conecta
         message_interval (int): Intervalo entre chistes automáticos
         automatic_messages (List[str]): Lista de mensajes (obsoleta)
         ignored_bots (Set[str]): Set de nombres de bots a ignorar
+        state_file (str): Archivo donde se guarda el estado de ejecución
+        state_snapshot_interval (int): Segundos entre instantáneas de estado
+        reply_cooldown (int): Segundos mínimos entre respuestas a un usuario
+        pipeline_timing (bool): Mide el coste de cada etapa del pipeline
+        pipeline_stats_interval (int): Segundos entre informes de tiempos
+        use_uvloop (bool): Usa uvloop como bucle de eventos si está instalado
+        slow_callback_ms (int): Umbral para registrar callbacks lentos
+        profiler_interval_ms (int): Milisegundos entre muestras del perfilador
+        profiler_window (int): Segundos de cada captura del perfilador
+        profiler_dir (str): Directorio de los volcados del perfilador
+        config_watch_interval (int): Segundos entre comprobaciones del .env
+        chat_transport (str): Transporte de chat ("irc" o "eventsub")
+        eventsub_ws_url (str): WebSocket de EventSub
+        twitch_api_url (str): Dirección base de la API Helix
+        twitch_auth_url (str): Dirección base de OAuth de Twitch
+        default_language (str): Idioma de los canales sin idioma asignado
+        channel_languages (Dict[str, str]): Idioma de cada canal
+        content_dir (str): Directorio con chistes y factos adicionales
     """
 
-    def __init__(self):
-        """Inicializa la configuración del bot."""
-        self.token: str = os.getenv("BOT_TOKEN", "")
-        self.nick: str = os.getenv("BOT_NICK", "antiplutoniano_bot")
-        self.channel: str = os.getenv("TWITCH_CHANNEL", "")
-        interval = os.getenv("MESSAGE_INTERVAL", "300")
+    def __init__(self, env: Optional[Mapping[str, str]] = None):
+        """
+        Inicializa la configuración del bot.
+
+        Args:
+            env (Optional[Mapping[str, str]]): Variables de las que leer la
+                configuración (por defecto, las variables de entorno)
+        """
+        if env is None:
+            env = os.environ
+
+        self.token: str = env.get("BOT_TOKEN", "")
+        self.nick: str = env.get("BOT_NICK", "antiplutoniano_bot")
+
+        # Uno o varios canales separados por comas, en minúsculas y sin #
+        self.channels: List[str] = []
+        for name in env.get("TWITCH_CHANNEL", "").split(","):
+            name = name.strip().lstrip("#").lower()
+            if name and name not in self.channels:
+                self.channels.append(name)
+        self.channel: str = self.channels[0] if self.channels else ""
+
+        interval = env.get("MESSAGE_INTERVAL", "300")
         self.message_interval: int = int(interval)
 
         # Mensajes automáticos por defecto (ya no se usan)
         self.automatic_messages: List[str] = []
 
         # Lista de bots a ignorar (nombres en minúsculas para comparación)
-        self.ignored_bots: Set[str] = self._load_ignored_bots()
+        self.ignored_bots: Set[str] = self._load_ignored_bots(env)
+
+        # Instantáneas del estado de ejecución (0 desactiva las periódicas)
+        self.state_file: str = env.get("STATE_FILE", "bot_state.bin")
+        snapshot_interval = env.get("STATE_SNAPSHOT_INTERVAL", "30")
+        self.state_snapshot_interval: int = int(snapshot_interval)
+
+        # Enfriamiento de respuestas por usuario (0 = sin límite)
+        self.reply_cooldown: int = int(env.get("REPLY_COOLDOWN", "0"))
+
+        # Medición de tiempos del pipeline de mensajes
+        self.pipeline_timing: bool = _parse_bool(env.get("PIPELINE_TIMING", ""))
+        stats_interval = env.get("PIPELINE_STATS_INTERVAL", "300")
+        self.pipeline_stats_interval: int = int(stats_interval)
+
+        # Bucle de eventos y diagnóstico de rendimiento
+        self.use_uvloop: bool = _parse_bool(env.get("USE_UVLOOP", ""))
+        self.slow_callback_ms: int = int(env.get("SLOW_CALLBACK_MS", "0"))
+        profiler_interval = env.get("PROFILER_INTERVAL_MS", "5")
+        self.profiler_interval_ms: int = int(profiler_interval)
+        self.profiler_window: int = int(env.get("PROFILER_WINDOW", "30"))
+        self.profiler_dir: str = env.get("PROFILER_DIR", "profiles")
+
+        # Recarga automática al cambiar el .env (0 = solo con SIGHUP)
+        watch_interval = env.get("CONFIG_WATCH_INTERVAL", "0")
+        self.config_watch_interval: int = int(watch_interval)
+
+        # Transporte de chat y direcciones de Twitch (configurables para
+        # usar el servidor EventSub local de eventsub_local.py)
+        transport = env.get("CHAT_TRANSPORT", "irc")
+        self.chat_transport: str = transport.strip().lower()
+        self.eventsub_ws_url: str = env.get(
+            "EVENTSUB_WS_URL", "wss://eventsub.wss.twitch.tv/ws"
+        )
+        self.twitch_api_url: str = env.get(
+            "TWITCH_API_URL", "https://api.twitch.tv/helix"
+        )
+        self.twitch_auth_url: str = env.get(
+            "TWITCH_AUTH_URL", "https://id.twitch.tv/oauth2"
+        )
+
+        # Idioma del contenido de cada canal ("canal:en,otro_canal:es")
+        language = env.get("DEFAULT_LANGUAGE", "es")
+        self.default_language: str = language.strip().lower()
+        self.channel_languages: Dict[str, str] = {}
+        for item in env.get("CHANNEL_LANGUAGES", "").split(","):
+            name, _, code = item.partition(":")
+            name = name.strip().lstrip("#").lower()
+            if name:
+                self.channel_languages[name] = code.strip().lower()
+        self.content_dir: str = env.get("CONTENT_DIR", "")
 
         # Validar configuración
         self._validate_config()
 
-    def _load_ignored_bots(self) -> Set[str]:
+    def _load_ignored_bots(self, env: Mapping[str, str]) -> Set[str]:
         """
         Carga la lista de bots a ignorar desde las variables de entorno
         y añade los bots más comunes de Twitch.
 
+        Args:
+            env (Mapping[str, str]): Variables de las que leer la configuración
+
         Returns:
             Set[str]: Set de nombres de usuario de bots a ignorar
         """
@@ -114,7 +253,7 @@ class BotConfig:
         }
 
         # Cargar bots adicionales desde variables de entorno
-        custom_ignored = os.getenv("IGNORED_BOTS", "")
+        custom_ignored = env.get("IGNORED_BOTS", "")
         if custom_ignored:
             # Separar por comas y convertir a minúsculas
             custom_bots = {
@@ -214,6 +353,38 @@ class BotConfig:
         if self.message_interval < 30:
             raise ValueError("MESSAGE_INTERVAL debe ser de al menos 30 segundos")
 
+        if self.state_snapshot_interval < 0:
+            raise ValueError("STATE_SNAPSHOT_INTERVAL no puede ser negativo")
+
+        if self.reply_cooldown < 0:
+            raise ValueError("REPLY_COOLDOWN no puede ser negativo")
+
+        if self.pipeline_stats_interval < 0:
+            raise ValueError("PIPELINE_STATS_INTERVAL no puede ser negativo")
+
+        if self.slow_callback_ms < 0:
+            raise ValueError("SLOW_CALLBACK_MS no puede ser negativo")
+
+        if self.profiler_interval_ms < 1:
+            raise ValueError("PROFILER_INTERVAL_MS debe ser de al menos 1 ms")
+
+        if self.profiler_window < 0:
+            raise ValueError("PROFILER_WINDOW no puede ser negativo")
+
+        if self.config_watch_interval < 0:
+            raise ValueError("CONFIG_WATCH_INTERVAL no puede ser negativo")
+
+        if self.chat_transport not in CHAT_TRANSPORTS:
+            opciones = ", ".join(CHAT_TRANSPORTS)
+            raise ValueError(f"CHAT_TRANSPORT debe ser uno de: {opciones}")
+
+        if not self.default_language:
+            raise ValueError("DEFAULT_LANGUAGE no puede estar vacío")
+
+        for name, code in self.channel_languages.items():
+            if not code:
+                raise ValueError(f"CHANNEL_LANGUAGES: falta el idioma de '{name}'")
+
     def get_channels(self) -> List[str]:
         """
         Obtiene la lista de canales formateados para twitchio.
@@ -221,7 +392,47 @@ class BotConfig:
         Returns:
             List[str]: Lista de canales con formato correcto
         """
-        return [self.channel]
+        return list(self.channels)
+
+    @classmethod
+    def reload(cls, env_file: str = ENV_FILE) -> "BotConfig":
+        """
+        Lee de nuevo la configuración. Los valores del archivo .env tienen
+        prioridad sobre las variables de entorno que tenía el proceso al
+        arrancar (sin las que se cargaron entonces desde el .env), de modo
+        que borrar una variable del archivo la devuelve a su valor por
+        defecto.
+
+        Args:
+            env_file (str): Ruta del archivo .env
+
+        Returns:
+            BotConfig: Configuración nueva ya validada
+
+        Raises:
+            ValueError: Si la configuración nueva no es válida
+        """
+        env = dict(_PROCESS_ENV)
+        if env_file:
+            values = dotenv_values(env_file)
+            env.update({key: val for key, val in values.items() if val is not None})
+        return cls(env)
+
+    def diff(self, other: "BotConfig") -> List[str]:
+        """
+        Compara esta configuración con otra.
+
+        Args:
+            other (BotConfig): Configuración con la que comparar
+
+        Returns:
+            List[str]: Nombres de los atributos que cambian
+        """
+        return [
+            name
+            for name in _RELOAD_FIELDS
+            if getattr(self, name) != getattr(other, name)
+        ]
 
     def add_automatic_message(self, message: str) -> None:
         """
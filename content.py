@@ -0,0 +1,390 @@
+"""
+Contenido del Self Bot Twitch
+=============================
+
+Este módulo guarda los chistes y factos del bot por idioma y los reparte
+entre canales sin duplicarlos.
+
+``ContentRegistry`` mantiene un único almacén de textos internados; cada
+pool (chistes, factos...) de cada idioma o canal es solo un array compacto
+de índices a ese almacén. Cada canal usa la vista de su propio canal si
+existe, si no la de su idioma y, en último caso, la del idioma por
+defecto, de modo que la memoria no crece con el número de canales.
+
+Autor: llopgui https://github.com/llopgui/
+Fecha de creación: Junio 2025
+Licencia: CC BY-NC-SA 4.0
+Repositorio: https://github.com/llopgui/self-bot-twitch
+"""
+
+import logging
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Chistes malos por defecto, por idioma
+DEFAULT_JOKES: Dict[str, List[str]] = {
+    "es": [
+        "🎧 ¿Por qué Plutón no puede ser DJ? ¡Porque le quitaron el título!",
+        "📞 ¿Cómo llama Plutón a sus amigos? ¡Planetarios perdidos!",
+        "📝 ¿Por qué Plutón reprobó el examen? ¡Porque no clasificó!",
+        "🌍 ¿Qué le dijo Plutón a la Tierra? «Eres un planeta insoportable».",
+        "⚽ ¿Por qué Plutón no juega fútbol? ¡Porque siempre lo sacan por falta de categoría!",
+        "🛡️ ¿Cómo se defiende Plutón en el espacio? «¡Soy enano, pero con clase!».",
+        "🪐 ¿Qué le dijo Júpiter a Plutón? «Deja de orbitar mis problemas».",
+        "🎉 ¿Por qué Plutón no entra en la lista de invitados? ¡Porque lo degradaron a plus-one!",
+        "🎵 ¿Qué música escucha Plutón? ¡Coldplay-to!",
+        "💪 ¿Por qué Plutón no va al gimnasio? ¡Por más que entrena, sigue siendo enano!",
+        "😢 ¿Qué hace Plutón cuando está triste? ¡Se pone a planetar su soledad!",
+        "🕵️ ¿Por qué Plutón es el mejor espía? ¡Porque todos pasan sin notarlo!",
+        "🔭 ¿Qué le dijo un telescopio a Plutón? «Eres pequeño, pero brillas en la oscuridad».",
+        "⭐ ¿Cómo pide Plutón un deseo? «¡Que la IAU me reclasifique!»",
+        "🗺️ ¿Por qué Plutón no usa GPS? ¡Porque siempre está fuera del mapa!",
+        "☀️ ¿Qué le dijo el Sol a Plutón? «Deja de darme vueltas, ¡que me mareas!».",
+        "📖 ¿Por qué Plutón es buen poeta? ¡Porque escribe versos enanos!",
+        "🎓 ¿Qué estudia Plutón en la universidad? ¡Astrología dwarf!",
+        "👋 ¿Cómo se despiden en Plutón? «¡Nos orbitamos pronto!».",
+        "🌙 ¿Qué le dijo la Luna a Plutón? «No te sientas mal... ¡yo tampoco soy planeta!»",
+        "🍕 ¿Por qué Plutón no puede pedir pizza? ¡Porque no está en el área de entrega!",
+        "💼 ¿Qué pone Plutón en su CV? «Ex-planeta con experiencia en el espacio».",
+        "🎮 ¿Por qué Plutón no juega videojuegos? ¡Porque siempre lo sacan del lobby!",
+        "☎️ ¿Qué dice Plutón cuando contesta el teléfono? «¿Aló? ¿Siguen ahí mis derechos planetarios?»",
+        "🎭 ¿Por qué Plutón es buen actor? ¡Porque domina el papel de marginado!",
+        "🏠 ¿Dónde vive Plutón? ¡En el barrio de los planetas enanos!",
+        "🎪 ¿Por qué Plutón no va al circo? ¡Porque él ya es el show de los enanos!",
+        "🧠 ¿Qué piensa Plutón antes de dormir? «Mañana seré planeta... ¡otra vez!»",
+        "🎂 ¿Cómo celebra Plutón su cumpleaños? ¡Cada 248 años terrestres!",
+        "🚗 ¿Por qué Plutón no maneja? ¡Porque su órbita es muy excéntrica!",
+    ],
+    "en": [
+        "🎧 Why can't Pluto be a DJ? It lost its title!",
+        "📝 Why did Pluto fail the exam? It didn't make the cut!",
+        "🌍 What did Pluto say to Earth? «You're just showing off your orbit».",
+        "🪐 What did Jupiter say to Pluto? «Stop orbiting my problems».",
+        "🎉 Why isn't Pluto on the guest list? It got downgraded to plus-one!",
+        "💪 Why doesn't Pluto go to the gym? No matter what, it stays dwarf!",
+        "🕵️ Why is Pluto the best spy? Everybody passes it by unnoticed!",
+        "⭐ How does Pluto make a wish? «Please, IAU, reclassify me!»",
+        "🗺️ Why doesn't Pluto use GPS? It's always off the map!",
+        "☀️ What did the Sun say to Pluto? «Stop circling me, I'm getting dizzy!»",
+        "👋 How do they say goodbye on Pluto? «Orbit you later!»",
+        "🌙 What did the Moon say to Pluto? «Don't feel bad... I'm not a planet either!»",
+        "🍕 Why can't Pluto order pizza? It's outside the delivery area!",
+        "💼 What's on Pluto's résumé? «Former planet with space experience».",
+        "🎮 Why doesn't Pluto play online? It always gets kicked from the lobby!",
+        "🏠 Where does Pluto live? In the dwarf planet neighbourhood!",
+        "🧠 What does Pluto think before sleeping? «Tomorrow I'll be a planet... again!»",
+        "🎂 How often does Pluto celebrate its birthday? Every 248 Earth years!",
+        "🚗 Why doesn't Pluto drive? Its orbit is way too eccentric!",
+        "📉 Why is Pluto bad at investing? It got demoted in 2006 and never recovered!",
+    ],
+}
+
+# Factos anti-Plutón por defecto, por idioma
+DEFAULT_FACTS: Dict[str, List[str]] = {
+    "es": [
+        "🌌 FACTO: Plutón no ha limpiado su órbita de otros objetos. ¡Su vecindario está lleno de cuerpos del Cinturón de Kuiper!",
+        "📊 FACTO: La IAU reclasificó Plutón como planeta enano en 2006. ¡Una decisión que causó controversia mundial!",
+        "🛸 FACTO: Plutón comparte órbita con otros objetos celestes. ¡Los planetas dominan solitarios sus órbitas!",
+        "📏 FACTO: Es más pequeño que nuestra Luna. ¡Solo tiene 2,370 km de diámetro!",
+        "⚖️ FACTO: Su masa es apenas el 0.2% de la masa terrestre. ¡Ni siquiera es el más masivo de los planetas enanos!",
+        "🔢 FACTO: Existen 5 planetas enanos reconocidos: Plutón, Eris, Ceres, Makemake y Haumea. ¡Plutón es uno más!",
+        "🌊 FACTO: La gravedad de Neptuno influye en Plutón. ¡Su órbita es caótica por esta interacción!",
+        "⚡ FACTO: Eris es más masivo que Plutón. ¡Su descubrimiento impulsó la reclasificación!",
+        "📐 FACTO: Órbita inclinada 17° sobre la eclíptica. ¡Los planetas tienen órbitas casi planas!",
+        "🎯 FACTO: Su órbita es excéntrica y elíptica. ¡Cruza la órbita de Neptuno!",
+        "🔍 FACTO: Forma parte del Cinturón de Kuiper. ¡Es uno de sus objetos más brillantes!",
+        "📋 FACTO: No cumple el tercer criterio planetario. 'Limpiar su órbita' es clave según la IAU.",
+        "🎱 FACTO: Solo 8 cuerpos cumplen todos los criterios: De Mercurio a Neptuno, según la IAU.",
+        "🚧 FACTO: Comparte zona con otros objetos transneptunianos. ¡Su 'barrio' orbital está congestionado!",
+        "📦 FACTO: Su tamaño es inferior a 7 lunas del sistema solar. ¡Ganímedes, Titán y otras son mayores!",
+        "🚀 FACTO: La sonda New Horizons reveló su complejidad. ¡Pero su geología no cambió su estatus!",
+        "🔄 FACTO: Ceres fue reclasificado igual en 2006: ¡De asteroide a planeta enano!",
+        "🌙 FACTO: Plutón tiene 5 lunas conocidas. ¡Caronte es casi tan grande como él!",
+        "🎪 FACTO: La definición excluye cuerpos en discos densos. ¡El Cinturón de Kuiper califica como tal!",
+        "🔬 FACTO: Alan Stern propuso definición geofísica. ¡Pero la IAU mantiene criterios dinámicos!",
+        "🗳️ FACTO: Solo 1% de astrónomos votó en 2006. ¡424 expertos decidieron su destino!",
+        "⏰ FACTO: Su órbita tarda 248 años terrestres. ¡Y nunca completó una desde su descubrimiento!",
+        "👑 FACTO: No es el objeto más grande del Cinturón. ¡Eris y Plutón son casi gemelos!",
+        "💪 FACTO: Planetas dominan gravitacionalmente su zona. ¡Plutón es influenciado por Neptuno!",
+        "🌬️ FACTO: Su atmósfera colapsa y revive estacionalmente. ¡Pero esto no afecta su clasificación!",
+        "🏔️ FACTO: Tiene montañas de hielo de agua. ¡Complejidad ≠ definición planetaria!",
+        "⚙️ FACTO: La IAU usa criterios dinámicos, no geológicos. ¡Importa su interacción orbital!",
+        "☄️ FACTO: Si estuviera cerca del Sol, sería cometa. ¡Sus hielos se sublimarían!",
+        "📊 FACTO: Existen +1,200 objetos similares en el Cinturón. ¡Clasificarlos como planetas sería caótico!",
+        "📅 FACTO: Descubierto en 1930, fue planeta 76 años. ¡El más breve de la historia!",
+        "📚 FACTO: Su nombre ya no está en listas planetarias. ¡Los libros de texto se actualizaron!",
+        "🤔 FACTO: Algunos científicos rechazan la definición. ¡El debate continúa hoy!",
+        "🪶 FACTO: La gravedad plutoniana es muy débil. ¡6 veces menor que la lunar!",
+        "🌘 FACTO: Planetas enanos pueden tener lunas y atmósfera. ¡Pero no son planetas según la IAU!",
+        "⏳ FACTO: Si limpiara su órbita, sería planeta. ¡Pero le tomaría billones de años!",
+        "🧊 FACTO: Está compuesto principalmente de hielo y roca. ¡Densidad de solo 1.9 g/cm³!",
+        "🌡️ FACTO: Temperatura superficial de -230°C. ¡Demasiado frío para actividad geológica activa!",
+        "🔭 FACTO: Tomó 76 años descubrir que tenía lunas. ¡Caronte fue encontrada en 1978!",
+        "🎭 FACTO: Plutón y Caronte forman sistema binario. ¡Ambos orbitan un punto común!",
+        "💫 FACTO: Su brillo varía por rotación y composición. ¡6.4 días terrestres por rotación!",
+        "🎪 FACTO: Pertenece a la familia de plutinos. ¡Objetos en resonancia 2:3 con Neptuno!",
+        "🌀 FACTO: Su órbita es resonante con Neptuno. ¡2 órbitas de Plutón = 3 de Neptuno!",
+        "📡 FACTO: New Horizons tardó 9 años en llegar. ¡Y solo pudo estudiarlo por horas!",
+        "🎨 FACTO: Su superficie tiene variaciones de color. ¡Desde beige hasta rojizo por metano!",
+        "⚗️ FACTO: Atmósfera de nitrógeno, metano y CO. ¡Pero 100,000 veces más tenue que la terrestre!",
+        "🏁 FACTO: Es el último 'planeta' descubierto. ¡Después solo se han encontrado planetas enanos!",
+        "🎯 FACTO: Su órbita lo acerca más que Neptuno al Sol. ¡Entre 1979-1999 fue el octavo!",
+        "🔄 FACTO: Acoplamiento de marea con Caronte. ¡Siempre muestran la misma cara!",
+        "⭐ FACTO: Walt Disney lo nombró como su perro. ¡Mismo año del descubrimiento: 1930!",
+        "🧮 FACTO: Su masa es 6 veces menor que la Luna. ¡Y 400 veces menor que la Tierra!",
+        "🔍 FACTO: Se necesitó el telescopio Hubble. ¡Para resolver sus lunas más pequeñas!",
+        "🌪️ FACTO: No tiene campo magnético detectable. ¡A diferencia de los planetas rocosos!",
+        "🎲 FACTO: Fue descubierto por accidente. ¡Buscando el hipotético Planeta X!",
+        "📐 FACTO: Su eje de rotación está inclinado 122°. ¡Rota casi de costado como Urano!",
+        "🌊 FACTO: Podría tener océano subsuperficial. ¡Pero eso no lo hace planeta!",
+        "🎪 FACTO: Es miembro del club de los KBO. ¡Kuiper Belt Objects, no planetas!",
+        "⚖️ FACTO: La decisión de la IAU fue democrática. ¡Votación científica, no política!",
+        "🏆 FACTO: Mantiene récord de excentricidad orbital. ¡Entre todos los explanetas del sistema!",
+        "🔬 FACTO: Su estudio ayudó a definir 'planeta'. ¡Ironía: contribuyó a su propia reclasificación!",
+        "🎯 FACTO: Es el prototipo de planeta enano. ¡Definió toda una nueva categoría!",
+        "📊 FACTO: Solo 0.07% del tamaño de la Tierra. ¡Más pequeño que Australia!",
+        "🌌 FACTO: Está en la frontera del sistema solar. ¡Donde comienza el espacio interestelar!",
+        "🎪 FACTO: Representa la transición histórica. ¡De 9 a 8 planetas oficiales!",
+        "🚫 FACTO: Plutón NO es un planeta desde 2006. Es un planeta enano.",
+        "🌕 FACTO: La luna de la Tierra es más grande que Plutón.",
+        "📏 FACTO: Plutón mide solo 2,374 km de diámetro. ¡Minúsculo!",
+    ],
+    "en": [
+        "🚫 FACT: Pluto has NOT been a planet since 2006. It is a dwarf planet.",
+        "🌌 FACT: Pluto has not cleared its orbit. Its neighbourhood is full of Kuiper Belt objects!",
+        "📊 FACT: The IAU reclassified Pluto as a dwarf planet in 2006.",
+        "📏 FACT: Pluto is smaller than our Moon. Only 2,377 km across!",
+        "⚖️ FACT: Pluto's mass is about 0.2% of Earth's.",
+        "🔢 FACT: There are 5 recognised dwarf planets: Pluto, Eris, Ceres, Makemake and Haumea.",
+        "⚡ FACT: Eris is more massive than Pluto. Its discovery triggered the reclassification!",
+        "📐 FACT: Pluto's orbit is tilted 17° from the ecliptic. Planets orbit almost flat!",
+        "🎯 FACT: Pluto's orbit is so eccentric that it crosses Neptune's!",
+        "📋 FACT: Pluto fails the IAU's third criterion: clearing the neighbourhood around its orbit.",
+        "🎱 FACT: Only 8 bodies meet every criterion, from Mercury to Neptune.",
+        "📦 FACT: Seven moons in the Solar System are bigger than Pluto, including Ganymede and Titan!",
+        "🚀 FACT: New Horizons revealed a complex world, but geology doesn't change its status!",
+        "🔄 FACT: Ceres was reclassified in 2006 too, from asteroid to dwarf planet!",
+        "🌙 FACT: Pluto has 5 known moons. Charon is almost half its size!",
+        "⏰ FACT: One orbit of Pluto takes 248 Earth years.",
+        "🌀 FACT: Pluto is in a 2:3 resonance with Neptune, like the rest of the plutinos.",
+        "💪 FACT: Planets dominate their orbital zone. Pluto is pushed around by Neptune!",
+        "☄️ FACT: If Pluto were close to the Sun, its ices would sublimate like a comet's!",
+        "🧊 FACT: Pluto is mostly ice and rock, with a density of only 1.9 g/cm³!",
+        "🌡️ FACT: Pluto's surface is around -230°C.",
+        "🎭 FACT: Pluto and Charon form a binary system orbiting a common point in space!",
+        "🎲 FACT: Pluto was found by accident while searching for the hypothetical Planet X!",
+        "📅 FACT: Discovered in 1930, Pluto was a planet for only 76 years!",
+        "🎯 FACT: Pluto is the prototype dwarf planet. It defined a whole new category!",
+    ],
+}
+
+
+class ContentRegistry:
+    """
+    Registro de pools de contenido por idioma y por canal sobre un único
+    almacén de textos internados.
+
+    Las vistas se identifican como ``"<pool>:<clave>"``, donde la clave es
+    un código de idioma (``es``, ``en``...) o el nombre de un canal.
+
+    Attributes:
+        default_language (str): Idioma de los canales sin idioma asignado
+    """
+
+    def __init__(self, default_language: str = "es"):
+        """
+        Inicializa el registro vacío.
+
+        Args:
+            default_language (str): Idioma de los canales sin idioma asignado
+        """
+        self.default_language = default_language
+
+        # Almacén único de textos y su posición, para no duplicarlos
+        self._strings: List[str] = []
+        self._positions: Dict[str, int] = {}
+
+        # Vista -> índices al almacén
+        self._views: Dict[str, array] = {}
+
+        self._channel_languages: Dict[str, str] = {}
+
+        # (canal, pool) -> vista, para que resolver sea O(1)
+        self._resolved: Dict[Tuple[str, str], str] = {}
+
+    @staticmethod
+    def view_key(pool: str, key: str) -> str:
+        """
+        Construye el identificador de una vista.
+
+        Args:
+            pool (str): Nombre del pool ("chistes", "factos"...)
+            key (str): Idioma o nombre de canal
+
+        Returns:
+            str: Identificador de la vista
+        """
+        return f"{pool}:{key.lower()}"
+
+    def add_pool(self, pool: str, key: str, items: Iterable[str]) -> str:
+        """
+        Registra (o sustituye) la vista de un pool para un idioma o canal.
+
+        Args:
+            pool (str): Nombre del pool
+            key (str): Idioma o nombre de canal
+            items (Iterable[str]): Textos del pool
+
+        Returns:
+            str: Identificador de la vista
+
+        Raises:
+            ValueError: Si el pool no tiene textos
+        """
+        indices = array("I", (self._intern(text) for text in items if text))
+        if not indices:
+            raise ValueError(f"El pool '{pool}' para '{key}' no tiene textos")
+
+        view = self.view_key(pool, key)
+        self._views[view] = indices
+        self._resolved.clear()
+        return view
+
+    def load_directory(self, path: str) -> List[str]:
+        """
+        Carga pools desde archivos ``<pool>.<clave>.txt`` (un texto por
+        línea; se ignoran las vacías y las que empiezan por ``#``, aunque
+        estén sangradas).
+
+        Args:
+            path (str): Directorio con los archivos de contenido
+
+        Returns:
+            List[str]: Vistas cargadas
+        """
+        loaded = []
+        for file in sorted(Path(path).glob("*.*.txt")):
+            pool, key = file.name[: -len(".txt")].split(".", 1)
+            lines = file.read_text(encoding="utf-8").splitlines()
+            items = [
+                line.strip()
+                for line in lines
+                if line.strip() and not line.strip().startswith("#")
+            ]
+            try:
+                loaded.append(self.add_pool(pool, key, items))
+            except ValueError as e:
+                logger.warning(f"Se ignora {file.name}: {e}")
+        return loaded
+
+    def set_channel_languages(self, languages: Mapping[str, str]) -> None:
+        """
+        Asigna el idioma de cada canal.
+
+        Args:
+            languages (Mapping[str, str]): Idioma por nombre de canal
+        """
+        self._channel_languages = {
+            channel.lower(): language.lower()
+            for channel, language in languages.items()
+        }
+        self._resolved.clear()
+
+    def language(self, channel: str) -> str:
+        """
+        Obtiene el idioma de un canal.
+
+        Args:
+            channel (str): Nombre del canal
+
+        Returns:
+            str: Código de idioma
+        """
+        return self._channel_languages.get(channel.lower(), self.default_language)
+
+    def resolve(self, channel: str, pool: str) -> str:
+        """
+        Elige la vista de un pool para un canal: la del propio canal, la de
+        su idioma o la del idioma por defecto.
+
+        Args:
+            channel (str): Nombre del canal
+            pool (str): Nombre del pool
+
+        Returns:
+            str: Identificador de la vista
+
+        Raises:
+            KeyError: Si el pool no tiene ninguna vista aplicable
+        """
+        cache_key = (channel, pool)
+        view = self._resolved.get(cache_key)
+        if view is not None:
+            return view
+
+        for key in (channel, self.language(channel), self.default_language):
+            view = self.view_key(pool, key)
+            if view in self._views:
+                self._resolved[cache_key] = view
+                return view
+        raise KeyError(f"No hay contenido '{pool}' para el canal {channel}")
+
+    def has_view(self, pool: str, key: str) -> bool:
+        """
+        Comprueba si un pool tiene vista para un idioma o canal.
+
+        Args:
+            pool (str): Nombre del pool
+            key (str): Idioma o nombre de canal
+
+        Returns:
+            bool: True si la vista existe
+        """
+        return self.view_key(pool, key) in self._views
+
+    def get(self, view: str, index: int) -> str:
+        """
+        Obtiene un texto de una vista.
+
+        Args:
+            view (str): Identificador de la vista
+            index (int): Posición dentro de la vista
+
+        Returns:
+            str: Texto almacenado
+        """
+        return self._strings[self._views[view][index]]
+
+    def view_sizes(self) -> Dict[str, int]:
+        """
+        Obtiene el número de textos de cada vista.
+
+        Returns:
+            Dict[str, int]: Tamaño por identificador de vista
+        """
+        return {view: len(indices) for view, indices in self._views.items()}
+
+    def __len__(self) -> int:
+        """int: Número de textos distintos en el almacén."""
+        return len(self._strings)
+
+    def _intern(self, text: str) -> int:
+        """
+        Añade un texto al almacén si no estaba.
+
+        Args:
+            text (str): Texto a añadir
+
+        Returns:
+            int: Posición del texto en el almacén
+        """
+        position = self._positions.get(text)
+        if position is None:
+            position = len(self._strings)
+            self._strings.append(sys.intern(text))
+            self._positions[text] = position
+        return position
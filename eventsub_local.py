@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Servidor EventSub local del Self Bot Twitch
+===========================================
+
+Imitación mínima de EventSub y de la parte de la API de Twitch que usa
+``EventSubTransport``, para probar el bot y medir latencias sin conectar
+con Twitch:
+
+- ``GET  /ws``: WebSocket con session_welcome, keepalives, notificaciones
+  ``channel.chat.message`` y session_reconnect (con ``reconnect``).
+- ``GET  /oauth2/validate``: validación del token.
+- ``GET  /helix/users``: identificadores de usuario por login.
+- ``POST/DELETE /helix/eventsub/subscriptions``: suscripciones.
+- ``POST /helix/chat/messages``: envío de mensajes (se reenvían al chat
+  como notificación, igual que hace Twitch).
+
+Uso como script (queda escuchando hasta Ctrl+C)::
+
+    python eventsub_local.py --port 8765
+
+y en el ``.env`` del bot::
+
+    CHAT_TRANSPORT=eventsub
+    EVENTSUB_WS_URL=ws://127.0.0.1:8765/ws
+    TWITCH_API_URL=http://127.0.0.1:8765/helix
+    TWITCH_AUTH_URL=http://127.0.0.1:8765/oauth2
+
+Autor: llopgui https://github.com/llopgui/
+Fecha de creación: Junio 2025
+Licencia: CC BY-NC-SA 4.0
+Repositorio: https://github.com/llopgui/self-bot-twitch
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+
+def _timestamp() -> str:
+    """
+    Obtiene la hora actual en el formato RFC 3339 que usa EventSub.
+
+    Returns:
+        str: Marca de tiempo en UTC
+    """
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class LocalEventSubServer:
+    """
+    Servidor EventSub local.
+
+    Attributes:
+        bot_login (str): Login del usuario asociado al token
+        keepalive (int): Segundos entre mensajes session_keepalive
+        sent (List[dict]): Mensajes enviados por el bot con la API de chat
+        chat_error (Optional[int]): Estado HTTP con el que falla
+            ``/chat/messages`` (para simular errores de Twitch, p. ej. 429)
+        unsubscribe_error (Optional[int]): Estado HTTP con el que falla el
+            borrado de suscripciones
+        welcome_delay (float): Segundos que tarda el welcome de una
+            conexión de reconexión (durante ese tiempo los mensajes siguen
+            llegando por la conexión anterior)
+        base_url (str): Dirección base del servidor una vez iniciado
+    """
+
+    def __init__(self, bot_login: str = "antiplutoniano_bot", keepalive: int = 10):
+        """
+        Inicializa el servidor.
+
+        Args:
+            bot_login (str): Login del usuario asociado al token
+            keepalive (int): Segundos entre mensajes session_keepalive
+        """
+        self.bot_login = bot_login
+        self.keepalive = keepalive
+        self.sent: List[dict] = []
+        self.chat_error: Optional[int] = None
+        self.unsubscribe_error: Optional[int] = None
+        self.welcome_delay = 0.0
+        self.base_url = ""
+
+        self._ids = itertools.count(1000)
+        self._users: Dict[str, str] = {}
+        self._sessions: Dict[str, web.WebSocketResponse] = {}
+        # id de suscripción -> (id de sesión, id del canal)
+        self._subscriptions: Dict[str, tuple] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+        self.bot_id = self.user_id(bot_login)
+
+        self.app = web.Application()
+        self.app.router.add_get("/ws", self._handle_ws)
+        self.app.router.add_get("/oauth2/validate", self._handle_validate)
+        self.app.router.add_get("/helix/users", self._handle_users)
+        self.app.router.add_post(
+            "/helix/eventsub/subscriptions", self._handle_subscribe
+        )
+        self.app.router.add_delete(
+            "/helix/eventsub/subscriptions", self._handle_unsubscribe
+        )
+        self.app.router.add_post("/helix/chat/messages", self._handle_chat_message)
+
+    def user_id(self, login: str) -> str:
+        """
+        Obtiene (o asigna) el identificador de un usuario.
+
+        Args:
+            login (str): Login del usuario
+
+        Returns:
+            str: Identificador del usuario
+        """
+        login = login.lower()
+        if login not in self._users:
+            self._users[login] = str(next(self._ids))
+        return self._users[login]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Inicia el servidor.
+
+        Args:
+            host (str): Dirección en la que escuchar
+            port (int): Puerto (0 para elegir uno libre)
+
+        Returns:
+            str: Dirección base del servidor (``http://host:puerto``)
+        """
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+        return self.base_url
+
+    async def close(self) -> None:
+        """Cierra las sesiones abiertas y detiene el servidor."""
+        for ws in list(self._sessions.values()):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def urls(self) -> Dict[str, str]:
+        """
+        Obtiene las direcciones que debe usar ``EventSubTransport``.
+
+        Returns:
+            Dict[str, str]: Argumentos ws_url, api_url y auth_url
+        """
+        ws_base = self.base_url.replace("http://", "ws://", 1)
+        return {
+            "ws_url": f"{ws_base}/ws",
+            "api_url": f"{self.base_url}/helix",
+            "auth_url": f"{self.base_url}/oauth2",
+        }
+
+    async def wait_subscribed(self, channel: str, timeout: float = 5.0) -> None:
+        """
+        Espera a que alguna sesión esté suscrita al chat de un canal.
+
+        Args:
+            channel (str): Login del canal
+            timeout (float): Espera máxima en segundos
+
+        Raises:
+            asyncio.TimeoutError: Si no hay suscripción a tiempo
+        """
+        broadcaster_id = self.user_id(channel)
+
+        async def poll():
+            while not any(
+                sub[1] == broadcaster_id for sub in self._subscriptions.values()
+            ):
+                await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(poll(), timeout)
+
+    async def reconnect(self) -> int:
+        """
+        Envía session_reconnect a todas las sesiones abiertas, como hace
+        Twitch antes de un mantenimiento.
+
+        Returns:
+            int: Número de sesiones avisadas
+        """
+        ws_base = self.base_url.replace("http://", "ws://", 1)
+        sessions = list(self._sessions.items())
+        for session_id, ws in sessions:
+            message = {
+                "metadata": {
+                    "message_id": str(uuid.uuid4()),
+                    "message_type": "session_reconnect",
+                    "message_timestamp": _timestamp(),
+                },
+                "payload": {
+                    "session": {
+                        "id": session_id,
+                        "status": "reconnecting",
+                        "keepalive_timeout_seconds": None,
+                        "reconnect_url": f"{ws_base}/ws?reconnect={session_id}",
+                    }
+                },
+            }
+            await ws.send_str(json.dumps(message))
+        return len(sessions)
+
+    async def inject(self, channel: str, author: str, text: str) -> int:
+        """
+        Envía un mensaje de chat a las sesiones suscritas al canal.
+
+        Args:
+            channel (str): Login del canal
+            author (str): Login del autor
+            text (str): Texto del mensaje
+
+        Returns:
+            int: Número de sesiones que recibieron la notificación
+        """
+        broadcaster_id = self.user_id(channel)
+        delivered = 0
+        for subscription_id, (session_id, target) in list(self._subscriptions.items()):
+            ws = self._sessions.get(session_id)
+            if target != broadcaster_id or ws is None or ws.closed:
+                continue
+            await ws.send_str(
+                json.dumps(self._notification(subscription_id, channel, author, text))
+            )
+            delivered += 1
+        return delivered
+
+    def _notification(
+        self, subscription_id: str, channel: str, author: str, text: str
+    ) -> dict:
+        """
+        Construye una notificación ``channel.chat.message``.
+
+        Args:
+            subscription_id (str): Identificador de la suscripción
+            channel (str): Login del canal
+            author (str): Login del autor
+            text (str): Texto del mensaje
+
+        Returns:
+            dict: Mensaje de EventSub
+        """
+        return {
+            "metadata": {
+                "message_id": str(uuid.uuid4()),
+                "message_type": "notification",
+                "message_timestamp": _timestamp(),
+                "subscription_type": "channel.chat.message",
+                "subscription_version": "1",
+            },
+            "payload": {
+                "subscription": {
+                    "id": subscription_id,
+                    "status": "enabled",
+                    "type": "channel.chat.message",
+                    "version": "1",
+                },
+                "event": {
+                    "broadcaster_user_id": self.user_id(channel),
+                    "broadcaster_user_login": channel.lower(),
+                    "broadcaster_user_name": channel,
+                    "chatter_user_id": self.user_id(author),
+                    "chatter_user_login": author.lower(),
+                    "chatter_user_name": author,
+                    "message_id": str(uuid.uuid4()),
+                    "message": {"text": text, "fragments": []},
+                    "message_type": "text",
+                },
+            },
+        }
+
+    async def _handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        """Sesión WebSocket de EventSub."""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        session_id = str(uuid.uuid4())
+        self._sessions[session_id] = ws
+
+        previous = request.query.get("reconnect")
+        if previous:
+            await asyncio.sleep(self.welcome_delay)
+            # Las suscripciones pasan a la sesión nueva, como en Twitch
+            for subscription_id, (owner, target) in list(self._subscriptions.items()):
+                if owner == previous:
+                    self._subscriptions[subscription_id] = (session_id, target)
+
+        await ws.send_str(
+            json.dumps(
+                {
+                    "metadata": {
+                        "message_id": str(uuid.uuid4()),
+                        "message_type": "session_welcome",
+                        "message_timestamp": _timestamp(),
+                    },
+                    "payload": {
+                        "session": {
+                            "id": session_id,
+                            "status": "connected",
+                            "keepalive_timeout_seconds": self.keepalive,
+                            "reconnect_url": None,
+                        }
+                    },
+                }
+            )
+        )
+
+        if previous and previous in self._sessions:
+            # Twitch cierra la conexión anterior tras el welcome de la nueva
+            await self._sessions[previous].close()
+
+        keepalive = asyncio.get_running_loop().create_task(
+            self._keepalive_loop(ws)
+        )
+        try:
+            async for _ in ws:
+                # EventSub no espera mensajes del cliente
+                pass
+        finally:
+            keepalive.cancel()
+            self._sessions.pop(session_id, None)
+            for subscription_id, (owner, _) in list(self._subscriptions.items()):
+                if owner == session_id:
+                    del self._subscriptions[subscription_id]
+        return ws
+
+    async def _keepalive_loop(self, ws: web.WebSocketResponse) -> None:
+        """Envía session_keepalive mientras la sesión siga abierta."""
+        while not ws.closed:
+            await asyncio.sleep(self.keepalive)
+            message = {
+                "metadata": {
+                    "message_id": str(uuid.uuid4()),
+                    "message_type": "session_keepalive",
+                    "message_timestamp": _timestamp(),
+                },
+                "payload": {},
+            }
+            await ws.send_str(json.dumps(message))
+
+    async def _handle_validate(self, request: web.Request) -> web.Response:
+        """Validación del token: cualquier token es válido."""
+        return web.json_response(
+            {
+                "client_id": "local",
+                "login": self.bot_login,
+                "user_id": self.bot_id,
+                "scopes": ["user:read:chat", "user:write:chat"],
+                "expires_in": 3600,
+            }
+        )
+
+    async def _handle_users(self, request: web.Request) -> web.Response:
+        """Usuarios por login."""
+        data = [
+            {"id": self.user_id(login), "login": login.lower(), "display_name": login}
+            for login in request.query.getall("login", [])
+        ]
+        return web.json_response({"data": data})
+
+    async def _handle_subscribe(self, request: web.Request) -> web.Response:
+        """Alta de una suscripción para una sesión WebSocket."""
+        body = await request.json()
+        session_id = body.get("transport", {}).get("session_id")
+        if session_id not in self._sessions:
+            return web.json_response({"message": "sesión desconocida"}, status=400)
+
+        subscription_id = str(uuid.uuid4())
+        broadcaster_id = body["condition"]["broadcaster_user_id"]
+        self._subscriptions[subscription_id] = (session_id, broadcaster_id)
+        data = {
+            "id": subscription_id,
+            "status": "enabled",
+            "type": body["type"],
+            "version": body["version"],
+            "condition": body["condition"],
+            "transport": body["transport"],
+        }
+        return web.json_response({"data": [data]}, status=202)
+
+    async def _handle_unsubscribe(self, request: web.Request) -> web.Response:
+        """Baja de una suscripción."""
+        if self.unsubscribe_error is not None:
+            return web.json_response(
+                {"message": "error simulado"}, status=self.unsubscribe_error
+            )
+        self._subscriptions.pop(request.query.get("id", ""), None)
+        return web.Response(status=204)
+
+    async def _handle_chat_message(self, request: web.Request) -> web.Response:
+        """Envío de un mensaje del bot, que se reenvía al chat."""
+        if self.chat_error is not None:
+            return web.json_response(
+                {"message": "error simulado"}, status=self.chat_error
+            )
+        body = await request.json()
+        self.sent.append(body)
+
+        channel = next(
+            (
+                login
+                for login, user_id in self._users.items()
+                if user_id == body["broadcaster_id"]
+            ),
+            None,
+        )
+        if channel is not None:
+            await self.inject(channel, self.bot_login, body["message"])
+
+        data = {"message_id": str(uuid.uuid4()), "is_sent": True, "drop_reason": None}
+        return web.json_response({"data": [data]})
+
+
+async def _serve(host: str, port: int, bot_login: str) -> None:
+    """
+    Ejecuta el servidor hasta que se interrumpa.
+
+    Args:
+        host (str): Dirección en la que escuchar
+        port (int): Puerto
+        bot_login (str): Login del bot asociado al token
+    """
+    server = LocalEventSubServer(bot_login)
+    base_url = await server.start(host, port)
+    for name, url in server.urls().items():
+        print(f"{name}: {url}")
+    print(f"Servidor EventSub local escuchando en {base_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor EventSub local")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--bot-login", default="antiplutoniano_bot")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args.host, args.port, args.bot_login))
+    except KeyboardInterrupt:
+        print("\nServidor detenido")
@@ -0,0 +1,600 @@
+"""
+Pipeline de procesamiento de mensajes del Self Bot Twitch
+=========================================================
+
+Este módulo divide el tratamiento de cada mensaje del chat en etapas
+encadenadas: filtrado, normalización, detección, enfriamiento y
+respuesta. Cada etapa puede cortar el procesamiento y, opcionalmente,
+acumula contadores de tiempo e histogramas para ver qué cuesta cada paso.
+
+Para añadir una etapa nueva basta con heredar de ``Stage`` e insertarla
+en ``bot.pipeline`` sin tocar la clase del bot.
+
+Autor: llopgui https://github.com/llopgui/
+Fecha de creación: Junio 2025
+Licencia: CC BY-NC-SA 4.0
+Repositorio: https://github.com/llopgui/self-bot-twitch
+"""
+
+import logging
+import re
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from transports import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+# Número de cubetas del histograma: la cubeta i cuenta las ejecuciones
+# que tardaron menos de 2^i microsegundos (la última recoge el resto)
+HISTOGRAM_BUCKETS = 16
+
+
+@dataclass(slots=True)
+class MessageContext:
+    """
+    Datos de un mensaje mientras recorre el pipeline.
+
+    Attributes:
+        message (ChatMessage): Mensaje recibido del transporte de chat
+        author (str): Nombre del autor
+        channel (str): Nombre del canal
+        content (str): Texto original del mensaje
+        normalized (str): Texto normalizado para la detección
+        reply (Optional[str]): Respuesta a enviar, si la hay
+    """
+
+    message: ChatMessage
+    author: str = ""
+    channel: str = ""
+    content: str = ""
+    normalized: str = ""
+    reply: Optional[str] = None
+
+
+@dataclass(slots=True)
+class StageStats:
+    """
+    Contadores de tiempo de una etapa.
+
+    Attributes:
+        calls (int): Número de ejecuciones
+        stops (int): Veces que la etapa cortó el procesamiento
+        total_ns (int): Tiempo total acumulado en nanosegundos
+        max_ns (int): Ejecución más lenta en nanosegundos
+        histogram (List[int]): Ejecuciones por cubeta de 2^i microsegundos
+    """
+
+    calls: int = 0
+    stops: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+    histogram: List[int] = field(default_factory=lambda: [0] * HISTOGRAM_BUCKETS)
+
+    def record(self, elapsed_ns: int, stopped: bool) -> None:
+        """
+        Registra una ejecución de la etapa.
+
+        Args:
+            elapsed_ns (int): Duración en nanosegundos
+            stopped (bool): True si la etapa cortó el procesamiento
+        """
+        self.calls += 1
+        self.stops += stopped
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        bucket = min((elapsed_ns // 1000).bit_length(), HISTOGRAM_BUCKETS - 1)
+        self.histogram[bucket] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Estima un percentil a partir del histograma.
+
+        Args:
+            fraction (float): Percentil entre 0 y 1 (0.99 para p99)
+
+        Returns:
+            float: Límite superior de la cubeta del percentil en
+            microsegundos (sin superar el máximo medido)
+        """
+        if not self.calls:
+            return 0.0
+        target = fraction * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if seen >= target:
+                break
+        return min(float(1 << bucket), self.max_ns / 1000)
+
+    def summary(self) -> str:
+        """
+        Resume los contadores en una línea legible.
+
+        Returns:
+            str: Resumen con llamadas, cortes, media, percentiles y máximo
+        """
+        mean_us = self.total_ns / self.calls / 1000 if self.calls else 0.0
+        return (
+            f"llamadas={self.calls} cortes={self.stops} "
+            f"media={mean_us:.1f}µs p50={self.percentile(0.50):.1f}µs "
+            f"p90={self.percentile(0.90):.1f}µs p99={self.percentile(0.99):.1f}µs "
+            f"max={self.max_ns / 1000:.1f}µs"
+        )
+
+
+class Stage(ABC):
+    """
+    Etapa base del pipeline.
+
+    Las subclases deben implementar ``process`` y devuelven True para continuar
+    o False para cortar el procesamiento del mensaje. Las etapas que
+    necesiten esperar (por ejemplo, para enviar un mensaje) declaran
+    ``is_async = True`` y definen ``process`` como corrutina.
+
+    Attributes:
+        name (str): Nombre único de la etapa
+        is_async (bool): True si ``process`` es una corrutina
+    """
+
+    name = "stage"
+    is_async = False
+
+    @abstractmethod
+    def process(self, ctx: MessageContext) -> bool:
+        """
+        Procesa el mensaje.
+
+        Args:
+            ctx (MessageContext): Contexto del mensaje
+
+        Returns:
+            bool: True para continuar, False para cortar el procesamiento
+        """
+
+
+class Pipeline:
+    """
+    Cadena ordenada de etapas que procesa cada mensaje del chat.
+
+    Attributes:
+        stages (List[Stage]): Etapas en orden de ejecución
+        timing (bool): True si se miden los tiempos de cada etapa
+        stats (Dict[str, StageStats]): Contadores por nombre de etapa
+    """
+
+    def __init__(self, stages: Optional[List[Stage]] = None, timing: bool = False):
+        """
+        Inicializa el pipeline.
+
+        Args:
+            stages (Optional[List[Stage]]): Etapas iniciales
+            timing (bool): Activa la medición de tiempos por etapa
+        """
+        self.stages: List[Stage] = []
+        self.timing = timing
+        self.stats: Dict[str, StageStats] = {}
+        for stage in stages or []:
+            self.add_stage(stage)
+
+    def add_stage(self, stage: Stage) -> None:
+        """
+        Añade una etapa al final del pipeline.
+
+        Args:
+            stage (Stage): Etapa a añadir
+        """
+        self._insert(len(self.stages), stage)
+
+    def insert_before(self, name: str, stage: Stage) -> None:
+        """
+        Inserta una etapa antes de otra existente.
+
+        Args:
+            name (str): Nombre de la etapa de referencia
+            stage (Stage): Etapa a insertar
+
+        Raises:
+            KeyError: Si no existe la etapa de referencia
+        """
+        self._insert(self._index(name), stage)
+
+    def insert_after(self, name: str, stage: Stage) -> None:
+        """
+        Inserta una etapa después de otra existente.
+
+        Args:
+            name (str): Nombre de la etapa de referencia
+            stage (Stage): Etapa a insertar
+
+        Raises:
+            KeyError: Si no existe la etapa de referencia
+        """
+        self._insert(self._index(name) + 1, stage)
+
+    def remove_stage(self, name: str) -> Stage:
+        """
+        Elimina una etapa del pipeline.
+
+        Args:
+            name (str): Nombre de la etapa
+
+        Returns:
+            Stage: Etapa eliminada
+
+        Raises:
+            KeyError: Si no existe la etapa
+        """
+        stage = self.stages.pop(self._index(name))
+        self.stats.pop(name, None)
+        return stage
+
+    def get_stage(self, name: str) -> Stage:
+        """
+        Obtiene una etapa por nombre.
+
+        Args:
+            name (str): Nombre de la etapa
+
+        Returns:
+            Stage: Etapa encontrada
+
+        Raises:
+            KeyError: Si no existe la etapa
+        """
+        return self.stages[self._index(name)]
+
+    async def run(self, ctx: MessageContext) -> bool:
+        """
+        Ejecuta las etapas sobre un mensaje hasta el final o hasta que
+        una de ellas corte el procesamiento.
+
+        Args:
+            ctx (MessageContext): Contexto del mensaje
+
+        Returns:
+            bool: True si el mensaje recorrió todas las etapas
+        """
+        if not self.timing:
+            for stage in self.stages:
+                result = stage.process(ctx)
+                if stage.is_async:
+                    result = await result
+                if not result:
+                    return False
+            return True
+
+        stats = self.stats
+        for stage in self.stages:
+            start = time.perf_counter_ns()
+            result = stage.process(ctx)
+            if stage.is_async:
+                result = await result
+            stats[stage.name].record(time.perf_counter_ns() - start, not result)
+            if not result:
+                return False
+        return True
+
+    def reset_stats(self) -> None:
+        """Pone a cero los contadores de todas las etapas."""
+        self.stats = {stage.name: StageStats() for stage in self.stages}
+
+    def stats_summary(self) -> List[str]:
+        """
+        Resume los contadores de cada etapa, en orden de ejecución.
+
+        Returns:
+            List[str]: Una línea por etapa
+        """
+        return [
+            f"{stage.name}: {self.stats[stage.name].summary()}" for stage in self.stages
+        ]
+
+    def _index(self, name: str) -> int:
+        """
+        Busca la posición de una etapa por nombre.
+
+        Args:
+            name (str): Nombre de la etapa
+
+        Returns:
+            int: Posición de la etapa
+
+        Raises:
+            KeyError: Si no existe la etapa
+        """
+        for index, stage in enumerate(self.stages):
+            if stage.name == name:
+                return index
+        raise KeyError(f"No existe la etapa: {name}")
+
+    def _insert(self, index: int, stage: Stage) -> None:
+        """
+        Inserta una etapa en una posición comprobando que el nombre sea único.
+
+        Args:
+            index (int): Posición de inserción
+            stage (Stage): Etapa a insertar
+
+        Raises:
+            ValueError: Si ya existe una etapa con el mismo nombre
+        """
+        if stage.name in self.stats:
+            raise ValueError(f"Ya existe una etapa llamada: {stage.name}")
+        self.stages.insert(index, stage)
+        self.stats[stage.name] = StageStats()
+
+
+class FilterStage(Stage):
+    """Descarta mensajes propios, sin autor, vacíos o de bots ignorados."""
+
+    name = "filter"
+
+    def __init__(self, bot):
+        """
+        Args:
+            bot: Bot propietario del pipeline
+        """
+        self.bot = bot
+
+    def process(self, ctx: MessageContext) -> bool:
+        """
+        Descarta el mensaje si no hay que atenderlo y, si no, copia autor,
+        canal y texto al contexto.
+
+        Args:
+            ctx (MessageContext): Contexto del mensaje
+
+        Returns:
+            bool: True si el mensaje debe seguir procesándose
+        """
+        message = ctx.message
+
+        # Evitar que el bot responda a sus propios mensajes
+        if message.echo:
+            return False
+
+        # Obtener información del autor del mensaje
+        author_name = message.author
+        if not author_name:
+            return False
+
+        # Verificar si debemos ignorar este usuario (bots, etc.)
+        if self.bot.config.is_ignored_user(author_name):
+            logger.debug(f"Ignorando mensaje del bot: {author_name}")
+            return False
+
+        # Obtener contenido del mensaje
+        content = message.content
+        if not content:
+            return False
+
+        ctx.author = author_name
+        ctx.channel = message.channel
+        ctx.content = content
+
+        # Log del mensaje recibido (solo para usuarios no ignorados)
+        logger.debug(f"Mensaje de {author_name}: {content}")
+        return True
+
+
+class NormalizeStage(Stage):
+    """Pasa el texto a minúsculas y elimina tildes para la detección."""
+
+    name = "normalize"
+
+    def process(self, ctx: MessageContext) -> bool:
+        """
+        Guarda en ``ctx.normalized`` el texto normalizado.
+
+        Args:
+            ctx (MessageContext): Contexto del mensaje
+
+        Returns:
+            bool: Siempre True
+        """
+        text = ctx.content.casefold()
+        if not text.isascii():
+            # "Plutón" -> "pluton"
+            text = "".join(
+                char
+                for char in unicodedata.normalize("NFKD", text)
+                if not unicodedata.combining(char)
+            )
+        ctx.normalized = text
+        return True
+
+
+class MatchStage(Stage):
+    """Continúa solo si el mensaje menciona a Plutón."""
+
+    name = "match"
+
+    # Patrones de detección sobre el texto normalizado
+    pluto_patterns = [
+        r"\bpluton\b",
+        r"\bpluto\b",
+        r"\bplanet[ao]?\s+pluton\b",
+        r"\bplanet[ao]?\s+pluto\b",
+    ]
+
+    def __init__(self):
+        # Una sola expresión precompilada en lugar de una búsqueda por patrón
+        self._regex = re.compile("|".join(self.pluto_patterns))
+
+    def process(self, ctx: MessageContext) -> bool:
+        """
+        Busca menciones a Plutón en el texto normalizado.
+
+        Args:
+            ctx (MessageContext): Contexto del mensaje
+
+        Returns:
+            bool: True si el mensaje menciona a Plutón
+        """
+        return self._regex.search(ctx.normalized) is not None
+
+
+class ThrottleStage(Stage):
+    """
+    Limita las respuestas a un mismo usuario en un mismo canal.
+
+    Las marcas de tiempo se guardan en la instantánea de estado para que
+    un reinicio no vuelva a responder a quien acaba de recibir un facto.
+    """
+
+    name = "throttle"
+
+    # Sección de la instantánea de estado
+    state_section = "enfriamientos"
+
+    def __init__(self, bot):
+        """
+        Args:
+            bot: Bot propietario del pipeline
+        """
+        self.bot = bot
+        # canal -> usuario -> hora de la última respuesta
+        self.last_reply: Dict[str, Dict[str, float]] = {}
+        # Próxima limpieza de enfriamientos caducados
+        self._next_prune = 0.0
+
+    def process(self, ctx: MessageContext) -> bool:
+        """
+        Corta el procesamiento si ya se respondió al autor en este canal
+        hace menos de ``REPLY_COOLDOWN`` segundos.
+
+        Una vez por periodo de enfriamiento se descartan los enfriamientos
+        caducados, de modo que la memoria no crece con cada usuario
+        distinto aunque no se tomen instantáneas.
+
+        Args:
+            ctx (MessageContext): Contexto del mensaje
+
+        Returns:
+            bool: True si se puede responder al autor
+        """
+        cooldown = self.bot.config.reply_cooldown
+        if cooldown <= 0:
+            return True
+
+        now = time.time()
+        if now >= self._next_prune:
+            self._prune(now - cooldown)
+            self._next_prune = now + cooldown
+
+        users = self.last_reply.setdefault(ctx.channel, {})
+        author = ctx.author.lower()
+        if now - users.get(author, 0.0) < cooldown:
+            logger.debug(f"Respuesta a {ctx.author} en enfriamiento")
+            return False
+
+        users[author] = now
+        self.bot.snapshot.mark_dirty(self.state_section)
+        return True
+
+    def get_state(self) -> dict:
+        """
+        Obtiene los enfriamientos vigentes para la instantánea.
+
+        Returns:
+            dict: Marcas de tiempo por canal y usuario
+        """
+        self._prune(time.time() - self.bot.config.reply_cooldown)
+        return {channel: dict(users) for channel, users in self.last_reply.items()}
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restaura los enfriamientos desde la instantánea.
+
+        Args:
+            state (dict): Marcas de tiempo por canal y usuario
+        """
+        self.last_reply = {channel: dict(users) for channel, users in state.items()}
+
+    def _prune(self, limit: float) -> None:
+        """
+        Descarta los enfriamientos anteriores a un instante y los canales
+        que se quedan vacíos.
+
+        Args:
+            limit (float): Hora a partir de la cual un enfriamiento sigue
+                vigente
+        """
+        pruned = {}
+        for channel, users in self.last_reply.items():
+            alive = {user: ts for user, ts in users.items() if ts > limit}
+            if alive:
+                pruned[channel] = alive
+        self.last_reply = pruned
+
+
+class RespondStage(Stage):
+    """Responde al autor con un facto anti-Plutón."""
+
+    name = "respond"
+    is_async = True
+
+    def __init__(self, bot):
+        """
+        Args:
+            bot: Bot propietario del pipeline
+        """
+        self.bot = bot
+
+    async def process(self, ctx: MessageContext) -> bool:
+        """
+        Elige un facto para el canal y lo envía como respuesta al autor.
+
+        Args:
+            ctx (MessageContext): Contexto del mensaje
+
+        Returns:
+            bool: True si se envió la respuesta
+        """
+        # Seleccionar el siguiente facto de la rotación del canal
+        facto = self.bot.choose_content(ctx.channel, "factos")
+        ctx.reply = f"@{ctx.author} {facto}"
+
+        # Responder al usuario
+        if not await self.bot.transport.send(ctx.channel, ctx.reply):
+            logger.warning(
+                f"No se pudo responder a {ctx.author} en {ctx.channel} "
+                f"(canal no disponible o mensaje rechazado)"
+            )
+            return False
+
+        logger.info(f"Respondido a {ctx.author} con facto anti-Plutón")
+        return True
+
+
+def build_default_pipeline(bot) -> Pipeline:
+    """
+    Construye el pipeline por defecto del bot.
+
+    Args:
+        bot: Bot propietario del pipeline
+
+    Returns:
+        Pipeline: Pipeline con las etapas filter, normalize, match,
+        throttle y respond
+    """
+    throttle = ThrottleStage(bot)
+    bot.snapshot.register(
+        throttle.state_section, throttle.get_state, throttle.set_state
+    )
+
+    return Pipeline(
+        [
+            FilterStage(bot),
+            NormalizeStage(),
+            MatchStage(),
+            throttle,
+            RespondStage(bot),
+        ],
+        timing=bot.config.pipeline_timing,
+    )
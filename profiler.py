@@ -0,0 +1,201 @@
+"""
+Perfilador por muestreo del Self Bot Twitch
+===========================================
+
+Este módulo toma muestras periódicas de la pila del hilo del bucle de
+eventos desde un hilo auxiliar y las vuelca en formato "folded"
+(una línea ``marco;marco;marco recuento`` por pila), compatible con
+flamegraph.pl, speedscope e inferno.
+
+Se puede activar y desactivar en caliente, por señal o desde código,
+sin reiniciar el bot.
+
+Autor: llopgui https://github.com/llopgui/
+Fecha de creación: Junio 2025
+Licencia: CC BY-NC-SA 4.0
+Repositorio: https://github.com/llopgui/self-bot-twitch
+"""
+
+import logging
+import os
+import sys
+import threading
+import itertools
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """
+    Perfilador por muestreo de la pila de un hilo.
+
+    Attributes:
+        interval (float): Segundos entre muestras
+        window (float): Duración por defecto de cada captura en segundos
+        output_dir (Path): Directorio donde se guardan los volcados
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        window: float = 30.0,
+        output_dir: str = "profiles",
+        thread_id: Optional[int] = None,
+    ):
+        """
+        Inicializa el perfilador.
+
+        Args:
+            interval (float): Segundos entre muestras
+            window (float): Duración por defecto de cada captura en segundos
+            output_dir (str): Directorio donde se guardan los volcados
+            thread_id (Optional[int]): Hilo a muestrear (por defecto, el que
+                crea el perfilador, normalmente el del bucle de eventos)
+        """
+        self.interval = interval
+        self.window = window
+        self.output_dir = Path(output_dir)
+        self._thread_id = thread_id or threading.get_ident()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        # Contador para que dos volcados en el mismo milisegundo no choquen
+        self._dumps = itertools.count(1)
+
+    @property
+    def running(self) -> bool:
+        """bool: True si hay una captura en curso."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, window: Optional[float] = None) -> bool:
+        """
+        Inicia una captura que se detiene sola al acabar la ventana.
+
+        Args:
+            window (Optional[float]): Duración en segundos (por defecto,
+                ``self.window``; 0 o menos para capturar hasta ``stop``)
+
+        Returns:
+            bool: True si se inició, False si ya había una captura en curso
+        """
+        if self.running:
+            return False
+
+        duration = self.window if window is None else window
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._sample,
+            args=(duration, self._stop_event),
+            name="sampling-profiler",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(f"Perfilador iniciado (ventana: {duration}s)")
+        return True
+
+    def stop(self) -> None:
+        """
+        Detiene la captura en curso. El volcado lo escribe el hilo del
+        perfilador, de modo que esta llamada no bloquea el bucle de eventos.
+        """
+        self._stop_event.set()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que el hilo del perfilador termine y escriba su volcado.
+        Es bloqueante: desde el bucle de eventos debe llamarse en un hilo.
+
+        Args:
+            timeout (Optional[float]): Espera máxima en segundos
+
+        Returns:
+            bool: True si no queda ninguna captura en curso
+        """
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return not self.running
+
+    def toggle(self) -> bool:
+        """
+        Inicia una captura si no hay ninguna en curso, o la detiene.
+
+        Returns:
+            bool: True si la captura ha quedado activa
+        """
+        if self.running:
+            self.stop()
+            return False
+        return self.start()
+
+    def _sample(self, duration: float, stop_event: threading.Event) -> None:
+        """
+        Cuerpo del hilo del perfilador: muestrea y vuelca al terminar.
+
+        Args:
+            duration (float): Duración de la captura en segundos
+            stop_event (threading.Event): Señal de parada anticipada
+        """
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + duration if duration > 0 else None
+        samples = 0
+
+        while not stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                stacks[self._fold(frame)] += 1
+                samples += 1
+            del frame
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+
+        try:
+            path = self._dump(stacks)
+        except OSError as e:
+            logger.error(f"Error guardando el perfil: {e}")
+            return
+        logger.info(f"Perfil guardado en {path} ({samples} muestras)")
+
+    @staticmethod
+    def _fold(frame) -> str:
+        """
+        Convierte una pila en una línea "folded" desde la raíz a la hoja.
+
+        Args:
+            frame: Marco más interno de la pila
+
+        Returns:
+            str: Marcos separados por ``;``
+        """
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            filename = os.path.basename(code.co_filename)
+            names.append(f"{code.co_qualname} ({filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        names.reverse()
+        return ";".join(names)
+
+    def _dump(self, stacks: Counter) -> Path:
+        """
+        Escribe las pilas muestreadas en un archivo ``.folded``.
+
+        Args:
+            stacks (Counter): Recuento de muestras por pila
+
+        Returns:
+            Path: Ruta del archivo escrito
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+        millis = int(now * 1000) % 1000
+        name = f"perfil-{stamp}-{millis:03d}-{next(self._dumps)}.folded"
+        path = self.output_dir / name
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
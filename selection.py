@@ -0,0 +1,407 @@
+"""
+Selección de contenido sin repeticiones del Self Bot Twitch
+===========================================================
+
+Este módulo elige qué chiste o facto enviar en cada canal sin repetir
+contenido a corto plazo y sin copiar las listas de contenido.
+
+Cada pool (chistes, factos...) se registra solo por su tamaño y, si se
+quiere, por sus pesos. El motor devuelve índices, de modo que todos los
+canales comparten el mismo contenido y cada canal solo guarda un cursor
+de unos pocos enteros:
+
+- Pools sin pesos: "bolsa barajada". Cada ciclo recorre todos los
+  elementos una vez siguiendo una permutación afín aleatoria
+  ``(inicio + i * paso) mod n``, que se renueva al acabar el ciclo, sobre
+  un orden base barajado que comparten todos los canales. No hay
+  repeticiones dentro de un ciclo ni entre dos ciclos seguidos.
+- Pools con pesos: tabla de alias (método de Vose) compartida por todos
+  los canales, más una ventana de enfriamiento estricta con los últimos
+  índices enviados en cada canal (por defecto, solo el último; como mucho
+  ``MAX_COOLDOWN_WINDOW``). Un elemento sale como mucho una vez cada
+  ``cooldown + 1`` envíos, así que la ventana reduce la frecuencia de los
+  elementos más pesados: con pesos ``[5] + [1] * 8`` el primero sale un
+  ~38 % de las veces sin enfriamiento, un ~29 % con 1 y un ~24 % con 2.
+  Con ``cooldown=0`` se respetan exactamente los pesos.
+
+Ambos casos seleccionan en O(1) y guardan por canal una cantidad de datos
+que no depende del tamaño del pool.
+
+Autor: llopgui https://github.com/llopgui/
+Fecha de creación: Junio 2025
+Licencia: CC BY-NC-SA 4.0
+Repositorio: https://github.com/llopgui/self-bot-twitch
+"""
+
+import math
+import random
+from array import array
+from typing import Dict, Optional, Sequence, Tuple
+
+# Intentos de volver a muestrear si el índice está en enfriamiento, antes
+# de buscar directamente uno que no lo esté
+MAX_COOLDOWN_RETRIES = 8
+
+# Ventana de enfriamiento por defecto de los pools con pesos (evita solo
+# repetir el último elemento, para no deformar demasiado los pesos)
+DEFAULT_WEIGHTED_COOLDOWN = 1
+
+# Tamaño máximo de la ventana de enfriamiento de los pools con pesos
+MAX_COOLDOWN_WINDOW = 16
+
+# Intentos de encontrar un paso coprimo al barajar un ciclo nuevo
+MAX_STEP_RETRIES = 32
+
+
+class AliasTable:
+    """
+    Tabla de alias para muestreo ponderado en O(1).
+
+    Attributes:
+        size (int): Número de elementos
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        """
+        Construye la tabla con el método de Vose.
+
+        Args:
+            weights (Sequence[float]): Pesos no negativos de cada elemento
+
+        Raises:
+            ValueError: Si no hay pesos o ninguno es positivo
+        """
+        size = len(weights)
+        total = float(sum(weights))
+        if size == 0 or total <= 0 or min(weights) < 0:
+            raise ValueError("Los pesos deben ser no negativos y sumar más de 0")
+
+        self.size = size
+        self._prob = array("d", [0.0]) * size
+        self._alias = array("I", [0]) * size
+
+        scaled = [w * size / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            low = small.pop()
+            high = large.pop()
+            self._prob[low] = scaled[low]
+            self._alias[low] = high
+            scaled[high] = (scaled[high] + scaled[low]) - 1.0
+            (small if scaled[high] < 1.0 else large).append(high)
+
+        # Los restos solo difieren de 1 por errores de redondeo
+        for index in small + large:
+            self._prob[index] = 1.0
+
+    def sample(self, rng: random.Random) -> int:
+        """
+        Elige un índice según los pesos.
+
+        Args:
+            rng (random.Random): Generador de números aleatorios
+
+        Returns:
+            int: Índice elegido
+        """
+        index = int(rng.random() * self.size)
+        if rng.random() < self._prob[index]:
+            return index
+        return self._alias[index]
+
+
+class _ShuffleCursor:
+    """Posición de un canal en la bolsa barajada de un pool."""
+
+    __slots__ = ("offset", "step", "pos", "last")
+
+    def __init__(self, offset: int, step: int, pos: int, last: int):
+        self.offset = offset
+        self.step = step
+        self.pos = pos
+        self.last = last
+
+
+class _CooldownCursor:
+    """Últimos índices enviados en un canal para un pool con pesos."""
+
+    __slots__ = ("recent", "head", "blocked")
+
+    def __init__(self, recent: array, head: int, size: int):
+        self.recent = recent
+        self.head = head
+        # Copia de la ventana para comprobar el enfriamiento en O(1)
+        self.blocked = {index for index in recent if index != size}
+
+
+class _Pool:
+    """Descripción compartida de un pool de contenido."""
+
+    __slots__ = ("size", "order", "alias", "cooldown", "eligible")
+
+    def __init__(
+        self,
+        size: int,
+        order: Optional[array],
+        alias: Optional[AliasTable],
+        cooldown: int,
+        eligible: Optional[array] = None,
+    ):
+        self.size = size
+        self.order = order
+        self.alias = alias
+        self.cooldown = cooldown
+        # Índices con peso positivo, para salir del enfriamiento
+        self.eligible = eligible
+
+
+class SelectionEngine:
+    """
+    Motor de selección de contenido por canal y por pool.
+
+    Attributes:
+        rng (random.Random): Generador de números aleatorios
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        """
+        Inicializa el motor.
+
+        Args:
+            rng (Optional[random.Random]): Generador a usar (útil para
+                obtener secuencias reproducibles)
+        """
+        self.rng = rng or random.Random()
+        self._pools: Dict[str, _Pool] = {}
+        self._cursors: Dict[Tuple[str, str], object] = {}
+
+    def register_pool(
+        self,
+        name: str,
+        size: int,
+        weights: Optional[Sequence[float]] = None,
+        cooldown: Optional[int] = None,
+    ) -> None:
+        """
+        Registra (o sustituye) un pool de contenido.
+
+        Si cambia el tamaño o los pesos de un pool existente, se descartan
+        los cursores de los canales para ese pool.
+
+        Args:
+            name (str): Nombre del pool
+            size (int): Número de elementos del pool
+            weights (Optional[Sequence[float]]): Pesos de cada elemento; sin
+                pesos se usa la bolsa barajada
+            cooldown (Optional[int]): Envíos durante los que un elemento no se
+                repite en un pool con pesos (por defecto,
+                ``DEFAULT_WEIGHTED_COOLDOWN``; como mucho
+                ``MAX_COOLDOWN_WINDOW`` y menos que el número de elementos
+                con peso positivo). Cuanto mayor es, más se alejan las
+                frecuencias de los pesos; 0 los respeta exactamente
+
+        Raises:
+            ValueError: Si el tamaño o los pesos no son válidos
+        """
+        if size <= 0:
+            raise ValueError(f"El pool '{name}' no tiene elementos")
+
+        order = None
+        alias = None
+        window = 0
+        eligible = None
+        if weights is None:
+            # Orden base barajado de forma determinista, para que los
+            # cursores guardados sigan siendo válidos tras un reinicio
+            order = array("I", range(size))
+            random.Random(f"{name}:{size}").shuffle(order)
+        else:
+            if len(weights) != size:
+                raise ValueError(
+                    f"El pool '{name}' tiene {size} elementos y {len(weights)} pesos"
+                )
+            alias = AliasTable(weights)
+            eligible = array("I", (i for i, w in enumerate(weights) if w > 0))
+            window = DEFAULT_WEIGHTED_COOLDOWN if cooldown is None else cooldown
+            window = max(0, min(window, MAX_COOLDOWN_WINDOW, len(eligible) - 1))
+
+        self._pools[name] = _Pool(size, order, alias, window, eligible)
+        for key in [key for key in self._cursors if key[1] == name]:
+            del self._cursors[key]
+
+    def choose(self, channel: str, pool: str) -> int:
+        """
+        Elige el siguiente índice de un pool para un canal.
+
+        Args:
+            channel (str): Nombre del canal
+            pool (str): Nombre del pool
+
+        Returns:
+            int: Índice del elemento elegido
+
+        Raises:
+            KeyError: Si el pool no está registrado
+        """
+        spec = self._pools[pool]
+        if spec.alias is None:
+            return self._choose_shuffled(channel, pool, spec)
+        return self._choose_weighted(channel, pool, spec)
+
+    def _choose_shuffled(self, channel: str, pool: str, spec: _Pool) -> int:
+        """
+        Avanza la bolsa barajada del canal.
+
+        Args:
+            channel (str): Nombre del canal
+            pool (str): Nombre del pool
+            spec (_Pool): Descripción del pool
+
+        Returns:
+            int: Índice del elemento elegido
+        """
+        key = (channel, pool)
+        cursor = self._cursors.get(key)
+        if cursor is None:
+            cursor = _ShuffleCursor(0, 1, spec.size, -1)
+            self._cursors[key] = cursor
+
+        if cursor.pos >= spec.size:
+            self._reshuffle(cursor, spec)
+
+        index = spec.order[(cursor.offset + cursor.pos * cursor.step) % spec.size]
+        cursor.pos += 1
+        cursor.last = index
+        return index
+
+    def _reshuffle(self, cursor: _ShuffleCursor, spec: _Pool) -> None:
+        """
+        Empieza un ciclo nuevo con una permutación afín aleatoria.
+
+        Args:
+            cursor (_ShuffleCursor): Cursor del canal
+            spec (_Pool): Descripción del pool
+        """
+        rng = self.rng
+        size = spec.size
+        # Un paso coprimo con el tamaño recorre todos los elementos. Se
+        # prefieren pasos distintos de 1 y n-1, que repetirían el orden base
+        # (en pools muy pequeños o de tamaño 6 no hay otros)
+        step = rng.choice((1, size - 1)) if size > 2 else 1
+        if size > 4:
+            for _ in range(MAX_STEP_RETRIES):
+                candidate = rng.randrange(2, size - 1)
+                if math.gcd(candidate, size) == 1:
+                    step = candidate
+                    break
+
+        offset = rng.randrange(size)
+        if size > 1 and spec.order[offset] == cursor.last:
+            # Evitar repetir el último elemento del ciclo anterior
+            offset = (offset + 1) % size
+
+        cursor.offset = offset
+        cursor.step = step
+        cursor.pos = 0
+
+    def _choose_weighted(self, channel: str, pool: str, spec: _Pool) -> int:
+        """
+        Muestrea con pesos evitando los índices en enfriamiento del canal.
+
+        Si tras ``MAX_COOLDOWN_RETRIES`` muestras el índice sigue en
+        enfriamiento, se toma el primer elemento con peso positivo que no lo
+        esté a partir de una posición aleatoria. La ventana es menor que el
+        número de esos elementos, así que basta con ``cooldown + 1`` pasos.
+
+        Args:
+            channel (str): Nombre del canal
+            pool (str): Nombre del pool
+            spec (_Pool): Descripción del pool
+
+        Returns:
+            int: Índice del elemento elegido
+        """
+        index = spec.alias.sample(self.rng)
+        if spec.cooldown == 0:
+            return index
+
+        key = (channel, pool)
+        cursor = self._cursors.get(key)
+        if cursor is None:
+            # Rellenar con un valor imposible para que no bloquee nada
+            recent = array("I", [spec.size]) * spec.cooldown
+            cursor = _CooldownCursor(recent, 0, spec.size)
+            self._cursors[key] = cursor
+
+        blocked = cursor.blocked
+        for _ in range(MAX_COOLDOWN_RETRIES):
+            if index not in blocked:
+                break
+            index = spec.alias.sample(self.rng)
+        else:
+            eligible = spec.eligible
+            start = self.rng.randrange(len(eligible))
+            for offset in range(spec.cooldown + 1):
+                index = eligible[(start + offset) % len(eligible)]
+                if index not in blocked:
+                    break
+
+        blocked.discard(cursor.recent[cursor.head])
+        blocked.add(index)
+        cursor.recent[cursor.head] = index
+        cursor.head = (cursor.head + 1) % spec.cooldown
+        return index
+
+    def forget(self, channel: str, pool: str) -> bool:
+        """
+        Descarta el cursor de un canal para un pool, p. ej. cuando el canal
+        pasa a usar otra vista y la rotación anterior ya no se va a retomar.
+
+        Args:
+            channel (str): Nombre del canal
+            pool (str): Nombre del pool
+
+        Returns:
+            bool: True si había cursor
+        """
+        return self._cursors.pop((channel, pool), None) is not None
+
+    def get_state(self) -> dict:
+        """
+        Obtiene los cursores de todos los canales para la instantánea.
+
+        Returns:
+            dict: Cursores por (canal, pool), junto al tamaño del pool
+        """
+        state = {}
+        for (channel, pool), cursor in self._cursors.items():
+            size = self._pools[pool].size
+            if isinstance(cursor, _ShuffleCursor):
+                value = (cursor.offset, cursor.step, cursor.pos, cursor.last)
+            else:
+                value = (cursor.recent.tobytes(), cursor.head)
+            state[(channel, pool)] = (size, value)
+        return state
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restaura los cursores desde la instantánea. Se descartan los de
+        pools desconocidos o cuyo tamaño o modo haya cambiado.
+
+        Args:
+            state (dict): Cursores por (canal, pool)
+        """
+        for (channel, pool), (size, value) in state.items():
+            spec = self._pools.get(pool)
+            if spec is None or spec.size != size:
+                continue
+            if spec.alias is None and len(value) == 4:
+                self._cursors[(channel, pool)] = _ShuffleCursor(*value)
+            elif spec.alias is not None and len(value) == 2:
+                recent = array("I")
+                recent.frombytes(value[0])
+                if len(recent) == spec.cooldown:
+                    cursor = _CooldownCursor(recent, value[1], spec.size)
+                    self._cursors[(channel, pool)] = cursor
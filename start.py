@@ -57,6 +57,14 @@ def check_dependencies():
         missing_deps.append("python-dotenv")
         print("❌ python-dotenv - No encontrado")
 
+    # Dependencias opcionales
+    try:
+        import uvloop
+
+        print("✅ uvloop - Instalado (opcional, USE_UVLOOP=true)")
+    except ImportError:
+        print("ℹ️  uvloop - No instalado (opcional)")
+
     if missing_deps:
         print(f"\n⚠️  Dependencias faltantes: {', '.join(missing_deps)}")
         print("📦 Ejecuta: pip install -r requirements.txt")
@@ -180,11 +188,9 @@ def start_bot():
 
     try:
         # Importar y ejecutar el bot
-        import asyncio
-
-        from twitch_bot import main
+        from twitch_bot import run
 
-        asyncio.run(main())
+        run()
 
     except KeyboardInterrupt:
         print("\n\n👋 Bot detenido por el usuario")
@@ -0,0 +1,351 @@
+"""
+Instantáneas de estado del Self Bot Twitch
+==========================================
+
+Este módulo guarda periódicamente el estado de ejecución del bot
+(temporizadores, rotaciones, enfriamientos...) en un archivo binario
+compacto y lo recupera al arrancar, para que un reinicio continúe
+donde lo dejó en lugar de empezar de cero.
+
+Cada componente registra una sección con una función que devuelve su
+estado y otra que lo restaura. Solo se vuelven a serializar las
+secciones marcadas como modificadas, y la escritura del archivo se
+hace fuera del bucle de eventos.
+
+Formato del archivo:
+    MAGIC (4 bytes) | versión (u8) | nº de secciones (u16)
+    y por cada sección: longitud del nombre (u8) | nombre (UTF-8) |
+    longitud de los datos (u32) | datos (marshal)
+
+Autor: llopgui https://github.com/llopgui/
+Fecha de creación: Junio 2025
+Licencia: CC BY-NC-SA 4.0
+Repositorio: https://github.com/llopgui/self-bot-twitch
+"""
+
+import asyncio
+import logging
+import marshal
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Cabecera del archivo de estado
+STATE_MAGIC = b"SBTS"
+STATE_VERSION = 1
+
+_HEADER = struct.Struct("<4sBH")
+_SECTION_NAME = struct.Struct("<B")
+_SECTION_DATA = struct.Struct("<I")
+
+
+class StateSnapshot:
+    """
+    Gestor de instantáneas incrementales del estado del bot.
+
+    Los datos de cada sección deben estar formados solo por tipos básicos
+    (dict, list, tuple, str, bytes, int, float, bool, None), ya que se
+    serializan con ``marshal``.
+
+    Attributes:
+        path (Path): Ruta del archivo de estado
+        interval (int): Segundos entre instantáneas (0 las desactiva)
+    """
+
+    def __init__(self, path: str, interval: int):
+        """
+        Inicializa el gestor de instantáneas.
+
+        Args:
+            path (str): Ruta del archivo de estado
+            interval (int): Segundos entre instantáneas (0 las desactiva)
+        """
+        self.path = Path(path)
+        self.interval = interval
+
+        # Proveedores registrados: nombre -> (obtener, restaurar)
+        self._providers: Dict[
+            str, Tuple[Callable[[], Any], Callable[[Any], None]]
+        ] = {}
+
+        # Último bloque serializado de cada sección (incluidas las leídas
+        # del disco que aún no tienen proveedor)
+        self._blobs: Dict[str, bytes] = {}
+
+        # Secciones modificadas desde la última instantánea. Las que se
+        # están guardando salen del conjunto y vuelven a él si la escritura
+        # falla, para no perder las marcas que lleguen entretanto
+        self._dirty: Set[str] = set()
+
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+        # Protege _blobs y el archivo temporal entre el hilo de escritura y
+        # save_sync
+        self._write_lock = threading.Lock()
+
+    def load(self) -> int:
+        """
+        Lee el archivo de estado del disco.
+
+        Las secciones leídas se aplican en cuanto se registra su
+        proveedor. Un archivo ausente o dañado no es un error: el bot
+        simplemente arranca sin estado previo.
+
+        Returns:
+            int: Número de secciones recuperadas
+        """
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return 0
+        except OSError as e:
+            logger.warning(f"No se pudo leer el estado guardado: {e}")
+            return 0
+
+        try:
+            self._blobs = self._decode(data)
+        except (ValueError, struct.error) as e:
+            logger.warning(f"Archivo de estado inválido, se ignora: {e}")
+            self._blobs = {}
+            return 0
+
+        # Aplicar secciones cuyos proveedores ya estuvieran registrados
+        for name in self._providers:
+            self._restore(name)
+
+        return len(self._blobs)
+
+    def register(
+        self,
+        name: str,
+        getter: Callable[[], Any],
+        setter: Callable[[Any], None],
+    ) -> None:
+        """
+        Registra una sección del estado.
+
+        Si ya se ha leído un valor guardado para la sección, se restaura
+        inmediatamente llamando a ``setter``.
+
+        Args:
+            name (str): Nombre único de la sección
+            getter (Callable): Devuelve una copia del estado actual
+            setter (Callable): Restaura el estado a partir del valor guardado
+        """
+        self._providers[name] = (getter, setter)
+        self._restore(name)
+
+    def mark_dirty(self, name: str) -> None:
+        """
+        Marca una sección como modificada para la próxima instantánea.
+
+        Args:
+            name (str): Nombre de la sección
+        """
+        self._dirty.add(name)
+
+    def start(self) -> None:
+        """Inicia la tarea de instantáneas periódicas."""
+        if self.interval <= 0 or self._task:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._snapshot_loop())
+
+    async def stop(self) -> None:
+        """Detiene la tarea periódica y guarda una última instantánea."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.save()
+
+    async def save(self) -> bool:
+        """
+        Guarda una instantánea si hay secciones modificadas.
+
+        El estado se captura en el bucle de eventos (para que sea
+        coherente) y la serialización y escritura se hacen en un hilo.
+
+        Returns:
+            bool: True si se escribió el archivo
+        """
+        async with self._lock:
+            dirty = self._take_dirty()
+            if not dirty:
+                return False
+            loop = asyncio.get_running_loop()
+            try:
+                states = self._collect(dirty)
+                await loop.run_in_executor(None, self._write, states)
+            except Exception as e:
+                logger.error(f"Error guardando el estado: {e}")
+                self._dirty |= dirty
+                return False
+            return True
+
+    def save_sync(self) -> bool:
+        """
+        Guarda una instantánea de forma síncrona.
+
+        Pensado para el cierre del proceso, cuando ya no hay bucle de
+        eventos disponible.
+
+        Returns:
+            bool: True si se escribió el archivo
+        """
+        dirty = self._take_dirty()
+        if not dirty:
+            return False
+        try:
+            self._write(self._collect(dirty))
+        except Exception as e:
+            logger.error(f"Error guardando el estado: {e}")
+            self._dirty |= dirty
+            return False
+        return True
+
+    async def _snapshot_loop(self) -> None:
+        """
+        Bucle que guarda instantáneas en el intervalo configurado. Un error
+        al guardar no detiene el bucle: las secciones siguen marcadas y se
+        reintentan en la siguiente vuelta.
+        """
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                try:
+                    await self.save()
+                except Exception as e:
+                    logger.error(f"Error en bucle de instantáneas: {e}")
+        finally:
+            if self._task is asyncio.current_task():
+                self._task = None
+
+    def _restore(self, name: str) -> None:
+        """
+        Aplica el valor guardado de una sección a su proveedor.
+
+        Args:
+            name (str): Nombre de la sección
+        """
+        blob = self._blobs.get(name)
+        if blob is None:
+            return
+        _, setter = self._providers[name]
+        try:
+            setter(marshal.loads(blob))
+        except Exception as e:
+            logger.warning(f"No se pudo restaurar la sección '{name}': {e}")
+
+    def _take_dirty(self) -> Set[str]:
+        """
+        Retira las secciones modificadas que tienen proveedor. Quien las
+        retira debe devolverlas a ``_dirty`` si no consigue guardarlas.
+
+        Returns:
+            Set[str]: Nombres de las secciones a guardar
+        """
+        dirty = self._dirty & self._providers.keys()
+        self._dirty -= dirty
+        return dirty
+
+    def _collect(self, names: Set[str]) -> Dict[str, Any]:
+        """
+        Captura el estado de unas secciones.
+
+        Args:
+            names (Set[str]): Nombres de las secciones
+
+        Returns:
+            Dict[str, Any]: Estado por sección
+        """
+        return {name: self._providers[name][0]() for name in names}
+
+    def _write(self, states: Dict[str, Any]) -> None:
+        """
+        Serializa las secciones modificadas y escribe el archivo completo
+        de forma atómica. Los bloques guardados solo se actualizan si la
+        escritura termina bien.
+
+        Args:
+            states (Dict[str, Any]): Estado de las secciones modificadas
+
+        Raises:
+            ValueError: Si algún estado no se puede serializar con marshal
+            OSError: Si no se puede escribir el archivo
+        """
+        with self._write_lock:
+            blobs = dict(self._blobs)
+            for name, value in states.items():
+                blobs[name] = marshal.dumps(value)
+
+            data = self._encode(blobs)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+            self._blobs = blobs
+        logger.debug(f"Estado guardado ({len(data)} bytes, {len(states)} secciones)")
+
+    @staticmethod
+    def _encode(blobs: Dict[str, bytes]) -> bytes:
+        """
+        Construye el contenido binario del archivo de estado.
+
+        Args:
+            blobs (Dict[str, bytes]): Datos serializados por sección
+
+        Returns:
+            bytes: Contenido del archivo
+        """
+        parts = [_HEADER.pack(STATE_MAGIC, STATE_VERSION, len(blobs))]
+        for name, blob in blobs.items():
+            raw_name = name.encode("utf-8")
+            parts.append(_SECTION_NAME.pack(len(raw_name)))
+            parts.append(raw_name)
+            parts.append(_SECTION_DATA.pack(len(blob)))
+            parts.append(blob)
+        return b"".join(parts)
+
+    @staticmethod
+    def _decode(data: bytes) -> Dict[str, bytes]:
+        """
+        Separa el contenido del archivo de estado en secciones.
+
+        Args:
+            data (bytes): Contenido del archivo
+
+        Returns:
+            Dict[str, bytes]: Datos serializados por sección
+
+        Raises:
+            ValueError: Si la cabecera o las secciones no son válidas
+        """
+        magic, version, count = _HEADER.unpack_from(data, 0)
+        if magic != STATE_MAGIC:
+            raise ValueError("cabecera desconocida")
+        if version != STATE_VERSION:
+            raise ValueError(f"versión {version} no soportada")
+
+        view = memoryview(data)
+        offset = _HEADER.size
+        blobs: Dict[str, bytes] = {}
+        for _ in range(count):
+            (name_len,) = _SECTION_NAME.unpack_from(data, offset)
+            offset += _SECTION_NAME.size
+            name = bytes(view[offset : offset + name_len]).decode("utf-8")
+            offset += name_len
+            (blob_len,) = _SECTION_DATA.unpack_from(data, offset)
+            offset += _SECTION_DATA.size
+            if offset + blob_len > len(data):
+                raise ValueError(f"sección '{name}' truncada")
+            blobs[name] = bytes(view[offset : offset + blob_len])
+            offset += blob_len
+        return blobs
@@ -0,0 +1,9 @@
+"""
+Configuración de pytest: permite importar los módulos del bot, que están
+en la raíz del repositorio, desde las pruebas.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,93 @@
+"""
+Pruebas de la configuración y su recarga
+========================================
+
+Autor: llopgui https://github.com/llopgui/
+Fecha de creación: Junio 2025
+Licencia: CC BY-NC-SA 4.0
+Repositorio: https://github.com/llopgui/self-bot-twitch
+"""
+
+import pytest
+
+import config
+from config import BotConfig
+
+BASE_ENV = {"BOT_TOKEN": "oauth:prueba", "TWITCH_CHANNEL": "canal"}
+
+
+def make_config(**values):
+    return BotConfig({**BASE_ENV, **values})
+
+
+def test_channels_are_normalized():
+    cfg = make_config(TWITCH_CHANNEL="#Uno, dos,UNO,,tres")
+    assert cfg.channels == ["uno", "dos", "tres"]
+    assert cfg.channel == "uno"
+
+
+def test_channel_languages():
+    cfg = make_config(CHANNEL_LANGUAGES="#Uno:EN, dos:es", DEFAULT_LANGUAGE="ES")
+    assert cfg.channel_languages == {"uno": "en", "dos": "es"}
+    assert cfg.default_language == "es"
+    with pytest.raises(ValueError):
+        make_config(CHANNEL_LANGUAGES="uno:")
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        {"BOT_TOKEN": ""},
+        {"BOT_TOKEN": "sin_prefijo"},
+        {"TWITCH_CHANNEL": ""},
+        {"MESSAGE_INTERVAL": "10"},
+        {"CHAT_TRANSPORT": "palomas"},
+        {"DEFAULT_LANGUAGE": " "},
+    ],
+)
+def test_invalid_values_are_rejected(values):
+    with pytest.raises(ValueError):
+        make_config(**values)
+
+
+def test_diff_lists_changed_fields():
+    old = make_config()
+    new = make_config(
+        TWITCH_CHANNEL="canal,otro", MESSAGE_INTERVAL="60", IGNORED_BOTS="foo"
+    )
+    assert old.diff(make_config()) == []
+    assert set(old.diff(new)) == {"channels", "message_interval", "ignored_bots"}
+
+
+def test_reload_reads_env_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "_PROCESS_ENV", dict(BASE_ENV))
+    env_file = tmp_path / ".env"
+    env_file.write_text("MESSAGE_INTERVAL=60\nIGNORED_BOTS=foo\n", encoding="utf-8")
+
+    cfg = BotConfig.reload(str(env_file))
+    assert cfg.message_interval == 60
+    assert cfg.is_ignored_user("foo")
+
+
+def test_reload_forgets_keys_removed_from_env_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "_PROCESS_ENV", dict(BASE_ENV))
+    env_file = tmp_path / ".env"
+    env_file.write_text("MESSAGE_INTERVAL=60\nIGNORED_BOTS=foo\n", encoding="utf-8")
+    before = BotConfig.reload(str(env_file))
+
+    # El .env cargado al arrancar ya está en os.environ; no debe influir
+    monkeypatch.setenv("MESSAGE_INTERVAL", "60")
+    monkeypatch.setenv("IGNORED_BOTS", "foo")
+    env_file.write_text("", encoding="utf-8")
+    after = BotConfig.reload(str(env_file))
+
+    assert set(before.diff(after)) == {"message_interval", "ignored_bots"}
+    assert after.message_interval == 300
+    assert not after.is_ignored_user("foo")
+
+
+def test_env_file_overrides_process_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "_PROCESS_ENV", {**BASE_ENV, "REPLY_COOLDOWN": "5"})
+    env_file = tmp_path / ".env"
+    env_file.write_text("REPLY_COOLDOWN=10\n", encoding="utf-8")
+    assert BotConfig.reload(str(env_file)).reply_cooldown == 10
@@ -0,0 +1,93 @@
+"""
+Pruebas del registro de contenido por idioma y canal
+====================================================
+
+Autor: llopgui https://github.com/llopgui/
+Fecha de creación: Junio 2025
+Licencia: CC BY-NC-SA 4.0
+Repositorio: https://github.com/llopgui/self-bot-twitch
+"""
+
+import pytest
+
+from content import ContentRegistry
+
+
+def make_registry():
+    registry = ContentRegistry(default_language="es")
+    registry.add_pool("chistes", "es", ["uno", "dos"])
+    registry.add_pool("chistes", "en", ["one", "two"])
+    registry.add_pool("chistes", "Especial", ["propio"])
+    return registry
+
+
+def test_resolve_prefers_channel_then_language_then_default():
+    registry = make_registry()
+    registry.set_channel_languages({"Especial": "en", "Ingles": "EN"})
+
+    assert registry.resolve("especial", "chistes") == "chistes:especial"
+    assert registry.resolve("ingles", "chistes") == "chistes:en"
+    assert registry.resolve("otro", "chistes") == "chistes:es"
+
+    # Un idioma sin contenido cae en el idioma por defecto
+    registry.set_channel_languages({"frances": "fr"})
+    assert registry.resolve("frances", "chistes") == "chistes:es"
+
+
+def test_resolve_follows_later_changes():
+    registry = make_registry()
+    assert registry.resolve("ingles", "chistes") == "chistes:es"
+
+    registry.set_channel_languages({"ingles": "en"})
+    assert registry.resolve("ingles", "chistes") == "chistes:en"
+
+    registry.add_pool("chistes", "ingles", ["solo aquí"])
+    assert registry.resolve("ingles", "chistes") == "chistes:ingles"
+
+
+def test_resolve_without_applicable_view():
+    registry = make_registry()
+    with pytest.raises(KeyError):
+        registry.resolve("canal", "factos")
+
+    registry.default_language = "fr"
+    with pytest.raises(KeyError):
+        registry.resolve("canal", "chistes")
+
+
+def test_texts_are_stored_once():
+    registry = ContentRegistry()
+    registry.add_pool("chistes", "es", ["compartido", "solo es"])
+    registry.add_pool("chistes", "en", ["compartido", "only en"])
+    registry.add_pool("factos", "es", ["compartido"])
+    assert len(registry) == 3
+
+    view = registry.resolve("canal", "factos")
+    assert registry.get(view, 0) is registry.get("chistes:en", 0)
+    assert registry.view_sizes() == {"chistes:es": 2, "chistes:en": 2, "factos:es": 1}
+
+
+def test_empty_pool_is_rejected():
+    registry = ContentRegistry()
+    with pytest.raises(ValueError):
+        registry.add_pool("chistes", "es", ["", ""])
+    assert not registry.has_view("chistes", "es")
+
+
+def test_load_directory(tmp_path):
+    (tmp_path / "chistes.en.txt").write_text(
+        "# Comentario\n\n  one  \n   # comentario sangrado\n\ttwo\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "factos.canal.txt").write_text("hecho\n", encoding="utf-8")
+    (tmp_path / "chistes.fr.txt").write_text(
+        "  # solo comentarios\n\n", encoding="utf-8"
+    )
+    (tmp_path / "notas.txt").write_text("no es un pool\n", encoding="utf-8")
+
+    registry = ContentRegistry()
+    assert registry.load_directory(str(tmp_path)) == ["chistes:en", "factos:canal"]
+    assert registry.has_view("chistes", "EN")
+    assert not registry.has_view("chistes", "fr")
+    assert [registry.get("chistes:en", i) for i in range(2)] == ["one", "two"]
+    assert registry.resolve("Canal", "factos") == "factos:canal"
@@ -0,0 +1,223 @@
+"""
+Pruebas del pipeline de mensajes
+================================
+
+Autor: llopgui https://github.com/llopgui/
+Fecha de creación: Junio 2025
+Licencia: CC BY-NC-SA 4.0
+Repositorio: https://github.com/llopgui/self-bot-twitch
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import pipeline
+from pipeline import (
+    HISTOGRAM_BUCKETS,
+    MatchStage,
+    MessageContext,
+    NormalizeStage,
+    Pipeline,
+    RespondStage,
+    Stage,
+    StageStats,
+    ThrottleStage,
+)
+from transports import ChatMessage
+
+
+class Recorder(Stage):
+    """Etapa que anota su nombre y devuelve un resultado fijo."""
+
+    def __init__(self, name, result=True, calls=None):
+        self.name = name
+        self.result = result
+        self.calls = calls if calls is not None else []
+
+    def process(self, ctx):
+        self.calls.append(self.name)
+        return self.result
+
+
+class AsyncRecorder(Recorder):
+    """Versión asíncrona de ``Recorder``."""
+
+    is_async = True
+
+    async def process(self, ctx):
+        self.calls.append(self.name)
+        return self.result
+
+
+def make_context(content="hola", author="ana", channel="canal"):
+    message = ChatMessage(channel=channel, author=author, content=content)
+    return MessageContext(message, author=author, channel=channel, content=content)
+
+
+def run(pipe, ctx=None):
+    return asyncio.run(pipe.run(ctx or make_context()))
+
+
+def test_stage_is_abstract():
+    with pytest.raises(TypeError):
+        Stage()
+
+
+def test_runs_stages_in_order():
+    calls = []
+    pipe = Pipeline([Recorder("a", calls=calls), AsyncRecorder("b", calls=calls)])
+    assert run(pipe)
+    assert calls == ["a", "b"]
+
+
+def test_stage_returning_false_short_circuits():
+    calls = []
+    pipe = Pipeline(
+        [
+            Recorder("a", calls=calls),
+            AsyncRecorder("b", result=False, calls=calls),
+            Recorder("c", calls=calls),
+        ],
+        timing=True,
+    )
+    assert not run(pipe)
+    assert calls == ["a", "b"]
+    assert pipe.stats["b"].stops == 1
+    assert pipe.stats["c"].calls == 0
+
+
+def test_insert_before_and_after():
+    pipe = Pipeline([Recorder("a"), Recorder("c")])
+    pipe.insert_before("c", Recorder("b"))
+    pipe.insert_after("c", Recorder("d"))
+    assert [stage.name for stage in pipe.stages] == ["a", "b", "c", "d"]
+    assert set(pipe.stats) == {"a", "b", "c", "d"}
+
+
+def test_duplicate_stage_names_are_rejected():
+    pipe = Pipeline([Recorder("a"), Recorder("b")])
+    with pytest.raises(ValueError):
+        pipe.add_stage(Recorder("a"))
+    with pytest.raises(ValueError):
+        pipe.insert_before("b", Recorder("a"))
+    with pytest.raises(ValueError):
+        pipe.insert_after("a", Recorder("b"))
+    assert [stage.name for stage in pipe.stages] == ["a", "b"]
+
+
+def test_unknown_reference_stage():
+    pipe = Pipeline([Recorder("a")])
+    with pytest.raises(KeyError):
+        pipe.insert_before("x", Recorder("b"))
+    with pytest.raises(KeyError):
+        pipe.remove_stage("x")
+
+
+def test_remove_stage():
+    pipe = Pipeline([Recorder("a"), Recorder("b")])
+    assert pipe.remove_stage("a").name == "a"
+    assert [stage.name for stage in pipe.stages] == ["b"]
+    assert "a" not in pipe.stats
+
+
+def test_histogram_buckets():
+    stats = StageStats()
+    stats.record(500, False)  # < 1 µs
+    stats.record(1_000, False)  # 1 µs -> [1, 2)
+    stats.record(3_000, True)  # 3 µs -> [2, 4)
+    stats.record(10**12, False)  # última cubeta
+    assert stats.histogram[0] == 1
+    assert stats.histogram[1] == 1
+    assert stats.histogram[2] == 1
+    assert stats.histogram[HISTOGRAM_BUCKETS - 1] == 1
+    assert stats.calls == 4
+    assert stats.stops == 1
+    assert stats.max_ns == 10**12
+
+
+def test_percentiles():
+    stats = StageStats()
+    assert stats.percentile(0.5) == 0.0
+
+    for elapsed_ns in [500] * 50 + [3_000] * 40 + [70_000] * 9 + [900_000]:
+        stats.record(elapsed_ns, False)
+    assert stats.percentile(0.50) == 1.0
+    assert stats.percentile(0.90) == 4.0
+    assert stats.percentile(0.99) == 128.0
+    # El límite de la cubeta no supera el máximo medido
+    assert stats.percentile(1.0) == 900.0
+    assert "p99=128.0µs" in stats.summary()
+
+
+def test_normalize_and_match():
+    ctx = make_context("¿El PLANETA Plutón?")
+    assert NormalizeStage().process(ctx)
+    assert ctx.normalized == "¿el planeta pluton?"
+    assert MatchStage().process(ctx)
+
+    ctx = make_context("plutonio")
+    NormalizeStage().process(ctx)
+    assert not MatchStage().process(ctx)
+
+
+def make_throttle(cooldown):
+    bot = SimpleNamespace(
+        config=SimpleNamespace(reply_cooldown=cooldown),
+        snapshot=SimpleNamespace(mark_dirty=lambda name: None),
+    )
+    return ThrottleStage(bot)
+
+
+def test_throttle_blocks_repeated_replies(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(pipeline.time, "time", lambda: now[0])
+    throttle = make_throttle(60)
+
+    assert throttle.process(make_context(author="Ana"))
+    assert not throttle.process(make_context(author="ana"))
+    assert throttle.process(make_context(author="ana", channel="otro"))
+
+    now[0] += 61
+    assert throttle.process(make_context(author="ana"))
+
+
+def test_throttle_prunes_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(pipeline.time, "time", lambda: now[0])
+    throttle = make_throttle(60)
+
+    for i in range(100):
+        throttle.process(make_context(author=f"usuario{i}", channel=f"canal{i % 3}"))
+    assert sum(len(users) for users in throttle.last_reply.values()) == 100
+
+    now[0] += 120
+    throttle.process(make_context(author="nuevo"))
+    assert throttle.last_reply == {"canal": {"nuevo": now[0]}}
+
+
+def test_throttle_state_round_trip(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(pipeline.time, "time", lambda: now[0])
+    throttle = make_throttle(60)
+    throttle.process(make_context(author="ana"))
+
+    restored = make_throttle(60)
+    restored.set_state(throttle.get_state())
+    assert not restored.process(make_context(author="ana"))
+
+
+def test_respond_reports_failed_send(caplog):
+    async def send(channel, text):
+        return False
+
+    bot = SimpleNamespace(
+        choose_content=lambda channel, pool: "Plutón no es un planeta",
+        transport=SimpleNamespace(send=send),
+    )
+    ctx = make_context(author="ana")
+    assert not asyncio.run(RespondStage(bot).process(ctx))
+    assert ctx.reply == "@ana Plutón no es un planeta"
+    assert "No se pudo responder a ana" in caplog.text
+    assert "Respondido" not in caplog.text
@@ -0,0 +1,46 @@
+"""
+Pruebas del perfilador por muestreo
+===================================
+
+Autor: llopgui https://github.com/llopgui/
+Fecha de creación: Junio 2025
+Licencia: CC BY-NC-SA 4.0
+Repositorio: https://github.com/llopgui/self-bot-twitch
+"""
+
+import time
+
+from profiler import SamplingProfiler
+
+
+def busy(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+def test_join_waits_for_the_dump(tmp_path):
+    profiler = SamplingProfiler(interval=0.001, window=0, output_dir=str(tmp_path))
+    assert profiler.start()
+    busy(0.05)
+    profiler.stop()
+    assert profiler.join(5)
+
+    (dump,) = tmp_path.glob("perfil-*.folded")
+    lines = dump.read_text(encoding="utf-8").splitlines()
+    assert lines
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("busy" in line for line in lines)
+
+
+def test_dumps_in_the_same_second_do_not_overwrite(tmp_path):
+    profiler = SamplingProfiler(interval=0.001, window=0, output_dir=str(tmp_path))
+    for _ in range(3):
+        assert profiler.start()
+        profiler.stop()
+        assert profiler.join(5)
+    assert len(list(tmp_path.glob("perfil-*.folded"))) == 3
+
+
+def test_join_without_capture():
+    assert SamplingProfiler().join(0)
@@ -0,0 +1,179 @@
+"""
+Pruebas de la recarga de configuración en caliente del bot
+==========================================================
+
+Autor: llopgui https://github.com/llopgui/
+Fecha de creación: Junio 2025
+Licencia: CC BY-NC-SA 4.0
+Repositorio: https://github.com/llopgui/self-bot-twitch
+"""
+
+import asyncio
+
+import twitch_bot
+from config import BotConfig
+from transports import Transport
+
+
+class FakeTransport(Transport):
+    """Transporte en memoria que anota las uniones y salidas de canales."""
+
+    name = "falso"
+
+    def __init__(self, fail_part=False, fail_join=False):
+        super().__init__(lambda message: None)
+        self.fail_part = fail_part
+        self.fail_join = fail_join
+        self.joined = []
+        self.parted = []
+        self.sent = []
+
+    async def run(self):
+        pass
+
+    async def send(self, channel, text):
+        self.sent.append((channel, text))
+        return True
+
+    async def join(self, channels):
+        if self.fail_join:
+            raise RuntimeError("join rechazado")
+        self.joined.extend(channels)
+
+    async def part(self, channels):
+        if self.fail_part:
+            raise RuntimeError("part rechazado")
+        self.parted.extend(channels)
+
+    async def close(self):
+        pass
+
+
+def run_with_bot(tmp_path, scenario, transport=None, **values):
+    """Crea un bot con un transporte falso y ejecuta un escenario."""
+    env = {
+        "BOT_TOKEN": "oauth:prueba",
+        "TWITCH_CHANNEL": "a,b",
+        "STATE_FILE": str(tmp_path / "estado.bin"),
+        **values,
+    }
+
+    async def main():
+        bot = twitch_bot.AntiplotonianoBot(BotConfig(env))
+        bot.transport = transport or FakeTransport()
+        try:
+            await scenario(bot, env)
+        finally:
+            await bot.close()
+
+    asyncio.run(main())
+
+
+async def apply(bot, env, **values):
+    new_config = BotConfig({**env, **values})
+    return await bot._apply_config(new_config, bot.config.diff(new_config))
+
+
+def test_channels_are_joined_and_parted(tmp_path):
+    async def scenario(bot, env):
+        assert await apply(bot, env, TWITCH_CHANNEL="b,c")
+        await asyncio.sleep(0)
+        assert bot.transport.parted == ["a"]
+        assert bot.transport.joined == ["c"]
+        assert bot.config.channels == ["b", "c"]
+
+    run_with_bot(tmp_path, scenario)
+
+
+def test_failed_part_keeps_current_config(tmp_path):
+    async def scenario(bot, env):
+        assert not await apply(bot, env, TWITCH_CHANNEL="b", MESSAGE_INTERVAL="60")
+        assert bot.config.channels == ["a", "b"]
+        assert bot.config.message_interval == 300
+
+    run_with_bot(tmp_path, scenario, FakeTransport(fail_part=True))
+
+
+def test_failed_join_is_logged(tmp_path, caplog):
+    async def scenario(bot, env):
+        assert await apply(bot, env, TWITCH_CHANNEL="a,b,c")
+        await asyncio.sleep(0.01)
+        assert not bot._join_tasks
+
+    run_with_bot(tmp_path, scenario, FakeTransport(fail_join=True))
+    assert "join rechazado" in caplog.text
+
+
+def test_new_interval_restarts_joke_loop(tmp_path):
+    async def scenario(bot, env):
+        bot.joke_task = bot.loop.create_task(bot._joke_loop())
+        old_task = bot.joke_task
+        assert await apply(bot, env, MESSAGE_INTERVAL="60")
+        await asyncio.sleep(0)
+        assert old_task.cancelled()
+        assert bot.joke_task is not old_task and not bot.joke_task.done()
+        assert bot.config.message_interval == 60
+
+    run_with_bot(tmp_path, scenario)
+
+
+def test_restart_only_fields_keep_running_values(tmp_path):
+    async def scenario(bot, env):
+        new_file = str(tmp_path / "otro.bin")
+        assert await apply(bot, env, STATE_FILE=new_file, REPLY_COOLDOWN="30")
+        assert bot.config.reply_cooldown == 30
+        assert bot.config.state_file == env["STATE_FILE"]
+
+        # La siguiente recarga vuelve a detectar el cambio pendiente
+        pending = BotConfig({**env, "STATE_FILE": new_file, "REPLY_COOLDOWN": "30"})
+        assert bot.config.diff(pending) == ["state_file"]
+
+    run_with_bot(tmp_path, scenario)
+
+
+def test_channel_languages_are_applied(tmp_path):
+    async def scenario(bot, env):
+        assert bot.content.resolve("b", "chistes") == "chistes:es"
+        assert await apply(bot, env, CHANNEL_LANGUAGES="b:en")
+        assert bot.content.resolve("b", "chistes") == "chistes:en"
+
+    run_with_bot(tmp_path, scenario)
+
+
+def test_language_change_drops_old_rotations(tmp_path):
+    async def scenario(bot, env):
+        for channel in ("a", "b"):
+            bot.choose_content(channel, "chistes")
+        before = {("a", "chistes:es"), ("b", "chistes:es")}
+        assert set(bot.selector.get_state()) == before
+
+        assert await apply(bot, env, CHANNEL_LANGUAGES="b:en")
+        assert set(bot.selector.get_state()) == {("a", "chistes:es")}
+
+    run_with_bot(tmp_path, scenario)
+
+
+def test_rejected_config_is_not_applied(tmp_path, monkeypatch):
+    async def scenario(bot, env):
+        def invalid(cls, env_file=""):
+            return BotConfig({**env, "MESSAGE_INTERVAL": "5"})
+
+        monkeypatch.setattr(BotConfig, "reload", classmethod(invalid))
+        assert not await bot.reload_config()
+        assert bot.config.message_interval == 300
+
+        def no_content(cls, env_file=""):
+            return BotConfig({**env, "DEFAULT_LANGUAGE": "fr"})
+
+        monkeypatch.setattr(BotConfig, "reload", classmethod(no_content))
+        assert not await bot.reload_config()
+        assert bot.config.default_language == "es"
+
+        def valid(cls, env_file=""):
+            return BotConfig({**env, "REPLY_COOLDOWN": "15"})
+
+        monkeypatch.setattr(BotConfig, "reload", classmethod(valid))
+        assert await bot.reload_config()
+        assert bot.config.reply_cooldown == 15
+
+    run_with_bot(tmp_path, scenario)
@@ -0,0 +1,133 @@
+"""
+Pruebas de la selección de contenido sin repeticiones
+=====================================================
+
+Autor: llopgui https://github.com/llopgui/
+Fecha de creación: Junio 2025
+Licencia: CC BY-NC-SA 4.0
+Repositorio: https://github.com/llopgui/self-bot-twitch
+"""
+
+import random
+from collections import Counter
+
+import pytest
+
+from selection import AliasTable, SelectionEngine
+
+
+def make_engine(seed=1):
+    return SelectionEngine(random.Random(seed))
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 6, 7, 30, 66])
+def test_each_cycle_is_a_full_permutation(size):
+    engine = make_engine()
+    engine.register_pool("chistes", size)
+
+    picks = [engine.choose("canal", "chistes") for _ in range(size * 20)]
+    for start in range(0, len(picks), size):
+        assert sorted(picks[start : start + size]) == list(range(size))
+    if size > 1:
+        # Tampoco se repite el elemento en el cambio de ciclo
+        assert all(a != b for a, b in zip(picks, picks[1:]))
+
+
+def test_channels_have_independent_cursors():
+    engine = make_engine()
+    engine.register_pool("chistes", 10)
+    picks = {"a": [], "b": []}
+    for _ in range(10):
+        for channel in picks:
+            picks[channel].append(engine.choose(channel, "chistes"))
+    assert sorted(picks["a"]) == sorted(picks["b"]) == list(range(10))
+
+
+def test_shuffle_state_round_trip():
+    engine = make_engine()
+    engine.register_pool("chistes", 12)
+    seen = [engine.choose("canal", "chistes") for _ in range(5)]
+
+    restored = make_engine(seed=2)
+    restored.register_pool("chistes", 12)
+    restored.set_state(engine.get_state())
+    rest = [restored.choose("canal", "chistes") for _ in range(7)]
+    assert sorted(seen + rest) == list(range(12))
+
+
+def test_state_of_resized_pool_is_discarded():
+    engine = make_engine()
+    engine.register_pool("chistes", 12)
+    engine.choose("canal", "chistes")
+
+    restored = make_engine()
+    restored.register_pool("chistes", 13)
+    restored.set_state(engine.get_state())
+    assert restored.get_state() == {}
+
+
+@pytest.mark.parametrize("cooldown", [1, 3, 8, 16])
+def test_weighted_pool_respects_cooldown(cooldown):
+    engine = make_engine()
+    engine.register_pool("factos", 20, weights=[10] + [1] * 19, cooldown=cooldown)
+
+    picks = [engine.choose("canal", "factos") for _ in range(2000)]
+    for i, index in enumerate(picks):
+        assert index not in picks[max(0, i - cooldown) : i]
+
+
+def test_weighted_default_cooldown_avoids_immediate_repeats():
+    engine = make_engine()
+    engine.register_pool("factos", 10, weights=[100] + [1] * 9)
+    picks = [engine.choose("canal", "factos") for _ in range(1000)]
+    assert all(a != b for a, b in zip(picks, picks[1:]))
+
+
+def test_weighted_pool_never_picks_zero_weights():
+    engine = make_engine()
+    engine.register_pool("factos", 5, weights=[0, 0, 1, 1, 0], cooldown=4)
+    picks = {engine.choose("canal", "factos") for _ in range(200)}
+    assert picks == {2, 3}
+
+
+def test_weights_are_respected_without_cooldown():
+    engine = make_engine()
+    weights = [5] + [1] * 8
+    engine.register_pool("factos", len(weights), weights=weights, cooldown=0)
+
+    draws = 50_000
+    counts = Counter(engine.choose("canal", "factos") for _ in range(draws))
+    for index, weight in enumerate(weights):
+        assert counts[index] / draws == pytest.approx(weight / 13, abs=0.01)
+
+
+def test_weighted_state_round_trip():
+    engine = make_engine()
+    engine.register_pool("factos", 20, weights=[1] * 20, cooldown=5)
+    picks = [engine.choose("canal", "factos") for _ in range(5)]
+
+    restored = make_engine(seed=2)
+    restored.register_pool("factos", 20, weights=[1] * 20, cooldown=5)
+    restored.set_state(engine.get_state())
+    for _ in range(200):
+        index = restored.choose("canal", "factos")
+        assert index not in picks
+        picks = picks[1:] + [index]
+
+
+def test_forget_drops_only_one_cursor():
+    engine = make_engine()
+    engine.register_pool("chistes:es", 5)
+    engine.register_pool("chistes:en", 5)
+    for pool in ("chistes:es", "chistes:en"):
+        engine.choose("canal", pool)
+
+    assert engine.forget("canal", "chistes:es")
+    assert not engine.forget("canal", "chistes:es")
+    assert set(engine.get_state()) == {("canal", "chistes:en")}
+
+
+def test_alias_table_rejects_invalid_weights():
+    for weights in ([], [0, 0], [1, -1]):
+        with pytest.raises(ValueError):
+            AliasTable(weights)
@@ -0,0 +1,161 @@
+"""
+Pruebas de las instantáneas de estado
+=====================================
+
+Autor: llopgui https://github.com/llopgui/
+Fecha de creación: Junio 2025
+Licencia: CC BY-NC-SA 4.0
+Repositorio: https://github.com/llopgui/self-bot-twitch
+"""
+
+import asyncio
+
+from state import _HEADER, STATE_MAGIC, STATE_VERSION, StateSnapshot
+
+
+class Section:
+    """Sección de estado de prueba con un único valor."""
+
+    def __init__(self, value=None):
+        self.value = value
+        self.restored = None
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.restored = value
+
+
+def make_snapshot(path, interval=0, **sections):
+    snapshot = StateSnapshot(str(path), interval)
+    snapshot.load()
+    for name, section in sections.items():
+        snapshot.register(name, section.get, section.set)
+        snapshot.mark_dirty(name)
+    return snapshot
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "estado.bin"
+    value = {"ultimo": 1.5, "usuarios": {"ana": 3}, "lista": [1, "dos", b"3", None]}
+    snapshot = make_snapshot(path, chistes=Section(value), vacia=Section(()))
+    assert snapshot.save_sync()
+    assert path.read_bytes().startswith(STATE_MAGIC)
+
+    restored = StateSnapshot(str(path), 0)
+    assert restored.load() == 2
+    section = Section()
+    restored.register("chistes", section.get, section.set)
+    assert section.restored == value
+
+
+def test_save_without_changes_does_nothing(tmp_path):
+    snapshot = make_snapshot(tmp_path / "estado.bin", a=Section(1))
+    assert snapshot.save_sync()
+    assert not snapshot.save_sync()
+
+
+def test_sections_without_provider_are_kept(tmp_path):
+    path = tmp_path / "estado.bin"
+    make_snapshot(path, a=Section(1), b=Section(2)).save_sync()
+
+    snapshot = make_snapshot(path, a=Section(10))
+    assert snapshot.save_sync()
+
+    section = Section()
+    later = StateSnapshot(str(path), 0)
+    later.load()
+    later.register("b", section.get, section.set)
+    assert section.restored == 2
+
+
+def test_truncated_file_is_ignored(tmp_path):
+    path = tmp_path / "estado.bin"
+    make_snapshot(path, a=Section("x" * 100)).save_sync()
+    data = path.read_bytes()
+
+    for size in (0, 3, _HEADER.size, len(data) - 1):
+        path.write_bytes(data[:size])
+        assert StateSnapshot(str(path), 0).load() == 0
+
+
+def test_wrong_magic_or_version_is_ignored(tmp_path):
+    path = tmp_path / "estado.bin"
+    make_snapshot(path, a=Section(1)).save_sync()
+    data = path.read_bytes()
+
+    path.write_bytes(b"XXXX" + data[4:])
+    assert StateSnapshot(str(path), 0).load() == 0
+
+    header = _HEADER.pack(STATE_MAGIC, STATE_VERSION + 1, 1)
+    path.write_bytes(header + data[_HEADER.size :])
+    assert StateSnapshot(str(path), 0).load() == 0
+
+
+def test_missing_file_is_not_an_error(tmp_path):
+    assert StateSnapshot(str(tmp_path / "no_existe.bin"), 0).load() == 0
+
+
+def test_failed_save_keeps_sections_dirty(tmp_path):
+    path = tmp_path / "estado.bin"
+    section = Section(object())
+    snapshot = make_snapshot(path, a=section)
+
+    assert not snapshot.save_sync()
+    assert not path.exists()
+
+    section.value = 42
+    assert snapshot.save_sync()
+    restored = Section()
+    later = StateSnapshot(str(path), 0)
+    later.load()
+    later.register("a", restored.get, restored.set)
+    assert restored.restored == 42
+
+
+def test_failing_getter_does_not_stop_periodic_snapshots(tmp_path):
+    path = tmp_path / "estado.bin"
+
+    class Failing(Section):
+        def get(self):
+            if self.value is None:
+                raise RuntimeError("estado no disponible")
+            return self.value
+
+    async def scenario():
+        failing = Failing()
+        unmarshallable = Section(object())
+        snapshot = make_snapshot(path, a=failing, b=unmarshallable)
+        snapshot.interval = 0.01
+        snapshot.start()
+        await asyncio.sleep(0.05)
+        assert snapshot._task is not None and not snapshot._task.done()
+        assert not path.exists()
+
+        failing.value = 1
+        unmarshallable.value = 2
+        for _ in range(100):
+            if path.exists():
+                break
+            await asyncio.sleep(0.01)
+        await snapshot.stop()
+        assert snapshot._task is None
+
+    asyncio.run(scenario())
+
+    restored = StateSnapshot(str(path), 0)
+    assert restored.load() == 2
+
+
+def test_stopped_snapshots_can_restart(tmp_path):
+    async def scenario():
+        snapshot = make_snapshot(tmp_path / "estado.bin", a=Section(1))
+        snapshot.interval = 0.01
+        snapshot.start()
+        await snapshot.stop()
+        snapshot.start()
+        assert snapshot._task is not None
+        await snapshot.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,192 @@
+"""
+Pruebas de EventSubTransport contra el servidor EventSub local
+==============================================================
+
+Cada prueba levanta ``LocalEventSubServer`` en un puerto libre, conecta un
+``EventSubTransport`` y lo maneja con ``asyncio.run``.
+
+Autor: llopgui https://github.com/llopgui/
+Fecha de creación: Junio 2025
+Licencia: CC BY-NC-SA 4.0
+Repositorio: https://github.com/llopgui/self-bot-twitch
+"""
+
+import asyncio
+
+import pytest
+
+from eventsub_local import LocalEventSubServer
+from transports import ChatMessage, EventSubTransport, Transport, TransportError
+
+CHANNEL = "canal_local"
+
+# Espera máxima de cada paso de las pruebas (segundos)
+TIMEOUT = 5
+
+
+class Harness:
+    """Servidor local y transporte conectado, con los mensajes recibidos."""
+
+    def __init__(self, on_message=None):
+        self.server = LocalEventSubServer()
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self.errors: asyncio.Queue = asyncio.Queue()
+        self.ready = asyncio.Event()
+        self.transport = None
+        self._on_message = on_message or self.messages.put
+        self._task = None
+
+    async def __aenter__(self) -> "Harness":
+        await self.server.start()
+
+        async def on_ready():
+            self.ready.set()
+
+        async def on_error(error, message):
+            await self.errors.put((error, message))
+
+        self.transport = EventSubTransport(
+            "oauth:local",
+            [CHANNEL],
+            self._on_message,
+            on_ready,
+            on_error,
+            **self.server.urls(),
+        )
+        self._task = asyncio.get_running_loop().create_task(self.transport.run())
+        await asyncio.wait_for(self.ready.wait(), TIMEOUT)
+        await self.server.wait_subscribed(CHANNEL, TIMEOUT)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.transport.close()
+        await asyncio.wait_for(self._task, TIMEOUT)
+        await self.server.close()
+
+    async def next_message(self) -> ChatMessage:
+        """Espera al siguiente mensaje entregado por el transporte."""
+        return await asyncio.wait_for(self.messages.get(), TIMEOUT)
+
+
+def test_transport_is_abstract():
+    with pytest.raises(TypeError):
+        Transport(lambda message: None)
+
+
+def test_subscribes_on_welcome():
+    async def scenario():
+        async with Harness() as h:
+            broadcaster_id = h.server.user_id(CHANNEL)
+            subscription_id = h.transport._subscriptions[CHANNEL]
+            _, target = h.server._subscriptions[subscription_id]
+            assert target == broadcaster_id
+            assert h.transport.user_id == h.server.bot_id
+
+    asyncio.run(scenario())
+
+
+def test_notification_becomes_chat_message():
+    async def scenario():
+        async with Harness() as h:
+            await h.server.inject(CHANNEL, "Espectador", "Plutón es un planeta")
+            message = await h.next_message()
+            assert message.channel == CHANNEL
+            assert message.author == "espectador"
+            assert message.content == "Plutón es un planeta"
+            assert not message.echo
+            assert 0 < message.sent_at <= message.received_at
+
+    asyncio.run(scenario())
+
+
+def test_send_uses_chat_api_and_echo_is_detected():
+    async def scenario():
+        async with Harness() as h:
+            assert await h.transport.send(CHANNEL, "hola")
+            assert h.server.sent[-1]["message"] == "hola"
+            assert h.server.sent[-1]["sender_id"] == h.server.bot_id
+            assert h.server.sent[-1]["broadcaster_id"] == h.server.user_id(CHANNEL)
+
+            echo = await h.next_message()
+            assert echo.echo
+            assert echo.content == "hola"
+
+    asyncio.run(scenario())
+
+
+def test_send_returns_false_on_api_error():
+    async def scenario():
+        async with Harness() as h:
+            h.server.chat_error = 429
+            assert not await h.transport.send(CHANNEL, "hola")
+            assert not h.server.sent
+
+    asyncio.run(scenario())
+
+
+def test_part_deletes_subscription():
+    async def scenario():
+        async with Harness() as h:
+            await h.transport.part([CHANNEL])
+            assert CHANNEL not in h.transport.channels
+            assert not h.transport._subscriptions
+            assert not h.server._subscriptions
+
+            assert await h.server.inject(CHANNEL, "espectador", "hola") == 0
+
+    asyncio.run(scenario())
+
+
+def test_rejected_part_keeps_channel_and_subscription():
+    async def scenario():
+        async with Harness() as h:
+            h.server.unsubscribe_error = 500
+            with pytest.raises(TransportError):
+                await h.transport.part([CHANNEL])
+            assert CHANNEL in h.transport.channels
+            assert CHANNEL in h.transport._subscriptions
+
+            h.server.unsubscribe_error = None
+            await h.transport.part([CHANNEL])
+            assert not h.server._subscriptions
+
+    asyncio.run(scenario())
+
+
+def test_reconnect_does_not_lose_messages():
+    async def scenario():
+        async with Harness() as h:
+            old_session = h.transport._session_id
+            h.server.welcome_delay = 0.1
+            assert await h.server.reconnect() == 1
+
+            # Mensajes antes, durante y después del cambio de sesión
+            for i in range(20):
+                await h.server.inject(CHANNEL, "espectador", f"mensaje {i}")
+                await asyncio.sleep(0.01)
+
+            received = [(await h.next_message()).content for _ in range(20)]
+            assert received == [f"mensaje {i}" for i in range(20)]
+            assert h.transport._session_id != old_session
+            # Las suscripciones se conservan sin volver a suscribirse
+            assert len(h.server._subscriptions) == 1
+            assert len(h.server._sessions) == 1
+
+            assert await h.transport.send(CHANNEL, "sigo aquí")
+            assert (await h.next_message()).echo
+
+    asyncio.run(scenario())
+
+
+def test_message_errors_reach_on_error():
+    async def failing(message):
+        raise RuntimeError("fallo en el pipeline")
+
+    async def scenario():
+        async with Harness(on_message=failing) as h:
+            await h.server.inject(CHANNEL, "espectador", "hola")
+            error, message = await asyncio.wait_for(h.errors.get(), TIMEOUT)
+            assert isinstance(error, RuntimeError)
+            assert message.content == "hola"
+
+    asyncio.run(scenario())
@@ -0,0 +1,721 @@
+"""
+Transportes de chat del Self Bot Twitch
+=======================================
+
+Este módulo separa la recepción y el envío de mensajes del chat del resto
+del bot. Cada transporte entrega los mensajes como ``ChatMessage`` y
+ofrece las mismas operaciones (enviar, unirse y salir de canales), de
+modo que el pipeline no depende de cómo llegan los mensajes.
+
+Transportes disponibles:
+
+- ``irc``: el cliente IRC de twitchio (comportamiento por defecto).
+- ``eventsub``: WebSocket de EventSub con eventos ``channel.chat.message``;
+  los mensajes se envían con la API Helix. El token necesita los
+  permisos ``user:read:chat`` y ``user:write:chat``.
+
+Autor: llopgui https://github.com/llopgui/
+Fecha de creación: Junio 2025
+Licencia: CC BY-NC-SA 4.0
+Repositorio: https://github.com/llopgui/self-bot-twitch
+"""
+
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+import aiohttp
+import twitchio
+
+logger = logging.getLogger(__name__)
+
+# Direcciones de Twitch por defecto
+EVENTSUB_WS_URL = "wss://eventsub.wss.twitch.tv/ws"
+TWITCH_API_URL = "https://api.twitch.tv/helix"
+TWITCH_AUTH_URL = "https://id.twitch.tv/oauth2"
+
+# Margen sobre el keepalive anunciado por EventSub antes de reconectar
+KEEPALIVE_GRACE = 5
+
+# Espera máxima entre intentos de reconexión (segundos)
+MAX_RECONNECT_DELAY = 60
+
+# Tipos de mensaje del WebSocket que indican que la conexión terminó
+_CLOSED_TYPES = (
+    aiohttp.WSMsgType.CLOSE,
+    aiohttp.WSMsgType.CLOSING,
+    aiohttp.WSMsgType.CLOSED,
+    aiohttp.WSMsgType.ERROR,
+)
+
+
+@dataclass(slots=True)
+class ChatMessage:
+    """
+    Mensaje de chat independiente del transporte.
+
+    Attributes:
+        channel (str): Canal (login, en minúsculas)
+        author (str): Autor (login, en minúsculas)
+        content (str): Texto del mensaje
+        echo (bool): True si el mensaje lo envió el propio bot
+        sent_at (float): Hora de Twitch del mensaje (época, segundos)
+        received_at (float): Hora local de recepción (época, segundos)
+        raw (Any): Mensaje original del transporte
+    """
+
+    channel: str
+    author: str
+    content: str
+    echo: bool = False
+    sent_at: float = 0.0
+    received_at: float = field(default_factory=time.time)
+    raw: Any = None
+
+
+class TransportError(Exception):
+    """Error de comunicación con Twitch en un transporte."""
+
+
+class Transport(ABC):
+    """
+    Transporte base. Las subclases deben implementar ``run``, ``send``,
+    ``join``, ``part`` y ``close``.
+
+    Attributes:
+        name (str): Nombre del transporte
+        on_message (Callable): Corrutina que recibe cada ``ChatMessage``
+        on_ready (Optional[Callable]): Corrutina llamada al conectar
+        on_error (Optional[Callable]): Corrutina que recibe los errores al
+            procesar un mensaje, junto al mensaje
+    """
+
+    name = "transport"
+
+    def __init__(
+        self,
+        on_message: Callable[[ChatMessage], Awaitable[None]],
+        on_ready: Optional[Callable[[], Awaitable[None]]] = None,
+        on_error: Optional[Callable[[Exception, Any], Awaitable[None]]] = None,
+    ):
+        """
+        Inicializa el transporte.
+
+        Args:
+            on_message (Callable): Corrutina que recibe cada mensaje
+            on_ready (Optional[Callable]): Corrutina llamada al conectar
+            on_error (Optional[Callable]): Corrutina que recibe los errores
+                al procesar un mensaje (por defecto, se registran en el log)
+        """
+        self.on_message = on_message
+        self.on_ready = on_ready
+        self.on_error = on_error
+
+    @abstractmethod
+    async def run(self) -> None:
+        """Conecta y recibe mensajes hasta que se cierre el transporte."""
+
+    @abstractmethod
+    async def send(self, channel: str, text: str) -> bool:
+        """
+        Envía un mensaje a un canal.
+
+        Args:
+            channel (str): Nombre del canal
+            text (str): Texto a enviar
+
+        Returns:
+            bool: True si se envió, False si el canal no está disponible o
+            Twitch rechazó el mensaje
+        """
+
+    @abstractmethod
+    async def join(self, channels: List[str]) -> None:
+        """
+        Empieza a recibir mensajes de nuevos canales.
+
+        Args:
+            channels (List[str]): Nombres de los canales
+        """
+
+    @abstractmethod
+    async def part(self, channels: List[str]) -> None:
+        """
+        Deja de recibir mensajes de unos canales.
+
+        Args:
+            channels (List[str]): Nombres de los canales
+        """
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Cierra la conexión."""
+
+    async def _notify_ready(self) -> None:
+        """Avisa de que el transporte está conectado."""
+        if self.on_ready is not None:
+            await self.on_ready()
+
+    async def _deliver(self, message: ChatMessage) -> None:
+        """
+        Entrega un mensaje al receptor, pasando sus errores a ``on_error``.
+
+        Args:
+            message (ChatMessage): Mensaje recibido
+        """
+        try:
+            await self.on_message(message)
+        except Exception as e:
+            if self.on_error is None:
+                logger.exception(f"Error procesando un mensaje de {message.channel}")
+                return
+            await self.on_error(e, message)
+
+
+class IrcTransport(Transport):
+    """Transporte sobre el cliente IRC de twitchio."""
+
+    name = "irc"
+
+    def __init__(self, client, on_message, on_ready=None):
+        """
+        Inicializa el transporte IRC.
+
+        Args:
+            client (twitchio.Client): Cliente IRC ya configurado con sus canales
+            on_message (Callable): Corrutina que recibe cada mensaje
+            on_ready (Optional[Callable]): Corrutina llamada al conectar
+        """
+        super().__init__(on_message, on_ready)
+        self.client = client
+        client.add_event(self._event_ready, "event_ready")
+        client.add_event(self._event_message, "event_message")
+
+    async def run(self) -> None:
+        await self.client.start()
+
+    async def send(self, channel: str, text: str) -> bool:
+        target = self.client.get_channel(channel)
+        if not target:
+            return False
+        await target.send(text)
+        return True
+
+    async def join(self, channels: List[str]) -> None:
+        await self.client.join_channels(channels)
+
+    async def part(self, channels: List[str]) -> None:
+        await self.client.part_channels(channels)
+
+    async def close(self) -> None:
+        # Llamada explícita a twitchio: el cliente puede ser el propio bot,
+        # cuyo close() es el que invoca a este método
+        await twitchio.Client.close(self.client)
+
+    async def _event_ready(self) -> None:
+        """Evento de twitchio al conectar."""
+        await self._notify_ready()
+
+    async def _event_message(self, message) -> None:
+        """
+        Evento de twitchio al recibir un mensaje.
+
+        Args:
+            message (twitchio.Message): Mensaje recibido
+        """
+        await self.on_message(self.to_chat_message(message))
+
+    @staticmethod
+    def to_chat_message(message) -> ChatMessage:
+        """
+        Convierte un mensaje de twitchio en ``ChatMessage``.
+
+        Args:
+            message (twitchio.Message): Mensaje recibido
+
+        Returns:
+            ChatMessage: Mensaje independiente del transporte
+        """
+        received_at = time.time()
+        tags = message.tags or {}
+        sent_ms = tags.get("tmi-sent-ts")
+        author = message.author.name if message.author else ""
+        return ChatMessage(
+            channel=message.channel.name,
+            author=author or "",
+            content=message.content or "",
+            echo=message.echo,
+            sent_at=int(sent_ms) / 1000 if sent_ms else received_at,
+            received_at=received_at,
+            raw=message,
+        )
+
+
+class EventSubTransport(Transport):
+    """
+    Transporte sobre el WebSocket de EventSub de Twitch.
+
+    Attributes:
+        channels (List[str]): Canales de los que se reciben mensajes
+        user_id (str): Identificador del usuario del bot
+        login (str): Login del usuario del bot
+    """
+
+    name = "eventsub"
+
+    def __init__(
+        self,
+        token: str,
+        channels: Iterable[str],
+        on_message,
+        on_ready=None,
+        on_error=None,
+        ws_url: str = EVENTSUB_WS_URL,
+        api_url: str = TWITCH_API_URL,
+        auth_url: str = TWITCH_AUTH_URL,
+    ):
+        """
+        Inicializa el transporte EventSub.
+
+        Args:
+            token (str): Token OAuth del bot (con o sin prefijo ``oauth:``)
+            channels (Iterable[str]): Canales de los que recibir mensajes
+            on_message (Callable): Corrutina que recibe cada mensaje
+            on_ready (Optional[Callable]): Corrutina llamada al conectar
+            on_error (Optional[Callable]): Corrutina que recibe los errores
+                al procesar un mensaje
+            ws_url (str): Dirección del WebSocket de EventSub
+            api_url (str): Dirección base de la API Helix
+            auth_url (str): Dirección base de OAuth de Twitch
+        """
+        super().__init__(on_message, on_ready, on_error)
+        self.token = token.removeprefix("oauth:")
+        self.channels: List[str] = list(channels)
+        self.ws_url = ws_url
+        self.api_url = api_url.rstrip("/")
+        self.auth_url = auth_url.rstrip("/")
+
+        self.client_id = ""
+        self.user_id = ""
+        self.login = ""
+
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._session_id: Optional[str] = None
+        # Segundos entre keepalives anunciados en el último welcome
+        self._keepalive = 10
+        self._closing = asyncio.Event()
+
+        # login -> id de usuario, y login -> id de suscripción
+        self._user_ids: Dict[str, str] = {}
+        self._subscriptions: Dict[str, str] = {}
+
+        # Referencias a las tareas de entrega para que no se pierdan
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def run(self) -> None:
+        self._closing.clear()
+        self._http = aiohttp.ClientSession()
+        try:
+            await self._validate_token()
+            delay = 1
+            while not self._closing.is_set():
+                try:
+                    ws = await self._open(self.ws_url, fresh=True)
+                    # Cada vuelta sigue en la sesión nueva tras un
+                    # session_reconnect, hasta que la conexión se cierre
+                    while ws is not None:
+                        delay = 1
+                        ws = await self._consume(ws)
+                except (aiohttp.ClientError, asyncio.TimeoutError, TransportError) as e:
+                    if self._closing.is_set():
+                        break
+                    logger.warning(
+                        f"EventSub desconectado ({e}), reintento en {delay}s"
+                    )
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, MAX_RECONNECT_DELAY)
+        finally:
+            if self._ws is not None:
+                await self._ws.close()
+                self._ws = None
+            self._session_id = None
+            await self._http.close()
+            self._http = None
+
+    async def send(self, channel: str, text: str) -> bool:
+        if self._http is None:
+            return False
+        try:
+            broadcaster_id = (await self._resolve_users([channel])).get(channel)
+            if not broadcaster_id:
+                return False
+
+            body = {
+                "broadcaster_id": broadcaster_id,
+                "sender_id": self.user_id,
+                "message": text,
+            }
+            data = await self._api("POST", "/chat/messages", json=body)
+        except (TransportError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"No se pudo enviar el mensaje a {channel}: {e}")
+            return False
+        result = (data.get("data") or [{}])[0]
+        if not result.get("is_sent", False):
+            reason = result.get("drop_reason") or {}
+            logger.warning(f"Mensaje descartado en {channel}: {reason.get('message')}")
+            return False
+        return True
+
+    async def join(self, channels: List[str]) -> None:
+        new = [name for name in channels if name not in self.channels]
+        self.channels.extend(new)
+        if self._session_id:
+            await self._subscribe(new)
+
+    async def part(self, channels: List[str]) -> None:
+        # La suscripción se borra antes de olvidar el canal: si Twitch
+        # rechaza la petición, el canal sigue figurando como unido
+        for name in channels:
+            subscription_id = self._subscriptions.get(name)
+            if subscription_id and self._http is not None:
+                await self._api(
+                    "DELETE", "/eventsub/subscriptions", params={"id": subscription_id}
+                )
+            self._subscriptions.pop(name, None)
+            if name in self.channels:
+                self.channels.remove(name)
+
+    async def close(self) -> None:
+        self._closing.set()
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def _open(self, url: str, fresh: bool) -> aiohttp.ClientWebSocketResponse:
+        """
+        Abre una conexión de EventSub y espera su session_welcome.
+
+        Args:
+            url (str): Dirección del WebSocket (inicial o de reconexión)
+            fresh (bool): True si es una sesión nueva, que necesita
+                suscripciones; tras un session_reconnect Twitch conserva
+                las de la sesión anterior
+
+        Returns:
+            aiohttp.ClientWebSocketResponse: Conexión con la sesión activa
+
+        Raises:
+            TransportError: Si la conexión se cierra, no llega el welcome o el
+                transporte se está cerrando
+        """
+        ws = await self._http.ws_connect(url)
+        try:
+            msg = await ws.receive(timeout=self._keepalive + KEEPALIVE_GRACE)
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                raise TransportError(f"conexión cerrada ({ws.close_code})")
+            data = json.loads(msg.data)
+            if data["metadata"]["message_type"] != "session_welcome":
+                raise TransportError("se esperaba session_welcome")
+
+            session = data["payload"]["session"]
+            self._session_id = session["id"]
+            timeout = session.get("keepalive_timeout_seconds")
+            self._keepalive = timeout or self._keepalive
+            if fresh:
+                self._subscriptions.clear()
+                await self._subscribe(self.channels)
+            if self._closing.is_set():
+                # close() llegó mientras se abría una conexión de reconexión
+                raise TransportError("transporte cerrado durante la conexión")
+        except BaseException:
+            await ws.close()
+            raise
+
+        self._ws = ws
+        await self._notify_ready()
+        return ws
+
+    async def _consume(
+        self, ws: aiohttp.ClientWebSocketResponse
+    ) -> Optional[aiohttp.ClientWebSocketResponse]:
+        """
+        Recibe mensajes de una sesión de EventSub hasta que se cierre o
+        Twitch pida reconectar.
+
+        Args:
+            ws (aiohttp.ClientWebSocketResponse): Conexión con la sesión activa
+
+        Returns:
+            Optional[aiohttp.ClientWebSocketResponse]: Conexión nueva tras un
+            session_reconnect, o None si la conexión se cerró a petición
+            del bot
+
+        Raises:
+            TransportError: Si la conexión se pierde o Twitch la cierra
+        """
+        try:
+            while True:
+                msg = await ws.receive(timeout=self._keepalive + KEEPALIVE_GRACE)
+                reconnect_url = self._handle(ws, msg)
+                if reconnect_url:
+                    return await self._handover(ws, reconnect_url)
+        except TransportError:
+            if self._closing.is_set():
+                return None
+            raise
+        finally:
+            if self._ws is ws:
+                self._ws = None
+            await ws.close()
+
+    async def _handover(
+        self, old: aiohttp.ClientWebSocketResponse, url: str
+    ) -> aiohttp.ClientWebSocketResponse:
+        """
+        Pasa a la conexión de reconexión sin perder mensajes: la conexión
+        anterior se sigue leyendo hasta que la nueva recibe su welcome,
+        como pide el protocolo de EventSub.
+
+        Args:
+            old (aiohttp.ClientWebSocketResponse): Conexión anterior
+            url (str): Dirección de reconexión indicada por Twitch
+
+        Returns:
+            aiohttp.ClientWebSocketResponse: Conexión nueva
+        """
+        loop = asyncio.get_running_loop()
+        opening = loop.create_task(self._open(url, fresh=False))
+        try:
+            while not opening.done() and not old.closed:
+                receiving = loop.create_task(old.receive())
+                await asyncio.wait(
+                    {receiving, opening}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not receiving.done():
+                    receiving.cancel()
+                    break
+                msg = receiving.result()
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    self._handle(old, msg)
+                elif msg.type in _CLOSED_TYPES:
+                    # Twitch cierra la conexión anterior tras el welcome
+                    break
+            return await opening
+        except BaseException:
+            opening.cancel()
+            raise
+
+    def _handle(
+        self, ws: aiohttp.ClientWebSocketResponse, msg: aiohttp.WSMessage
+    ) -> Optional[str]:
+        """
+        Procesa un mensaje de una conexión ya activa.
+
+        Args:
+            ws (aiohttp.ClientWebSocketResponse): Conexión del mensaje
+            msg (aiohttp.WSMessage): Mensaje recibido
+
+        Returns:
+            Optional[str]: Dirección de reconexión si Twitch la pide
+
+        Raises:
+            TransportError: Si la conexión se ha cerrado
+        """
+        if msg.type != aiohttp.WSMsgType.TEXT:
+            if msg.type in _CLOSED_TYPES:
+                raise TransportError(f"conexión cerrada ({ws.close_code})")
+            return None
+
+        received_at = time.time()
+        data = json.loads(msg.data)
+        message_type = data["metadata"]["message_type"]
+        payload = data.get("payload", {})
+
+        if message_type == "notification":
+            self._dispatch(data, received_at)
+        elif message_type == "session_reconnect":
+            return payload["session"]["reconnect_url"]
+        elif message_type == "revocation":
+            subscription = payload.get("subscription", {})
+            status = subscription.get("status")
+            logger.warning(f"Suscripción EventSub revocada: {status}")
+            self._forget_subscription(subscription.get("id"))
+        return None
+
+    def _dispatch(self, data: dict, received_at: float) -> None:
+        """
+        Entrega una notificación ``channel.chat.message`` como ``ChatMessage``.
+
+        Args:
+            data (dict): Mensaje de EventSub
+            received_at (float): Hora local de recepción
+        """
+        payload = data["payload"]
+        if payload["subscription"]["type"] != "channel.chat.message":
+            return
+
+        event = payload["event"]
+        message = ChatMessage(
+            channel=event["broadcaster_user_login"],
+            author=event["chatter_user_login"],
+            content=event["message"]["text"],
+            echo=event["chatter_user_id"] == self.user_id,
+            sent_at=_parse_timestamp(data["metadata"]["message_timestamp"]),
+            received_at=received_at,
+            raw=data,
+        )
+        # Igual que twitchio, cada mensaje se procesa en su propia tarea
+        task = asyncio.get_running_loop().create_task(self._deliver(message))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _validate_token(self) -> None:
+        """
+        Obtiene el client_id y el usuario asociados al token.
+
+        Raises:
+            TransportError: Si el token no es válido
+        """
+        headers = {"Authorization": f"OAuth {self.token}"}
+        async with self._http.get(f"{self.auth_url}/validate", headers=headers) as r:
+            if r.status != 200:
+                raise TransportError(f"Token no válido para EventSub ({r.status})")
+            data = await r.json()
+        self.client_id = data["client_id"]
+        self.user_id = data["user_id"]
+        self.login = data["login"]
+
+    async def _subscribe(self, channels: List[str]) -> None:
+        """
+        Suscribe la sesión actual a los mensajes de chat de unos canales.
+
+        Args:
+            channels (List[str]): Nombres de los canales
+        """
+        user_ids = await self._resolve_users(channels)
+        for name in channels:
+            broadcaster_id = user_ids.get(name)
+            if not broadcaster_id:
+                logger.warning(f"No se encontró el canal: {name}")
+                continue
+            body = {
+                "type": "channel.chat.message",
+                "version": "1",
+                "condition": {
+                    "broadcaster_user_id": broadcaster_id,
+                    "user_id": self.user_id,
+                },
+                "transport": {"method": "websocket", "session_id": self._session_id},
+            }
+            data = await self._api("POST", "/eventsub/subscriptions", json=body)
+            self._subscriptions[name] = data["data"][0]["id"]
+            logger.info(f"Suscrito por EventSub al chat de {name}")
+
+    def _forget_subscription(self, subscription_id: Optional[str]) -> None:
+        """
+        Olvida una suscripción revocada.
+
+        Args:
+            subscription_id (Optional[str]): Identificador de la suscripción
+        """
+        for name, known_id in list(self._subscriptions.items()):
+            if known_id == subscription_id:
+                del self._subscriptions[name]
+
+    async def _resolve_users(self, logins: List[str]) -> Dict[str, str]:
+        """
+        Obtiene los identificadores de usuario de unos logins, usando la
+        caché para los ya conocidos.
+
+        Args:
+            logins (List[str]): Logins de Twitch
+
+        Returns:
+            Dict[str, str]: Identificador por login (solo los encontrados)
+        """
+        missing = [login for login in logins if login not in self._user_ids]
+        # Helix admite hasta 100 logins por petición
+        for start in range(0, len(missing), 100):
+            params = [("login", login) for login in missing[start : start + 100]]
+            data = await self._api("GET", "/users", params=params)
+            for user in data.get("data", []):
+                self._user_ids[user["login"]] = user["id"]
+        known = self._user_ids
+        return {login: known[login] for login in logins if login in known}
+
+    async def _api(self, method: str, path: str, **kwargs) -> dict:
+        """
+        Hace una petición a la API Helix.
+
+        Args:
+            method (str): Método HTTP
+            path (str): Ruta dentro de la API
+            **kwargs: Argumentos adicionales para aiohttp
+
+        Returns:
+            dict: Respuesta JSON (vacía si no hay contenido)
+
+        Raises:
+            TransportError: Si la API devuelve un error
+        """
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Client-Id": self.client_id,
+        }
+        url = f"{self.api_url}{path}"
+        async with self._http.request(method, url, headers=headers, **kwargs) as r:
+            if r.status >= 400:
+                text = await r.text()
+                raise TransportError(f"{method} {path} -> {r.status}: {text}")
+            if r.status == 204:
+                return {}
+            return await r.json()
+
+
+def _parse_timestamp(value: str) -> float:
+    """
+    Convierte una marca de tiempo RFC 3339 de Twitch (con nanosegundos)
+    en segundos desde la época.
+
+    Args:
+        value (str): Marca de tiempo, p. ej. ``2023-07-19T14:56:51.634234626Z``
+
+    Returns:
+        float: Segundos desde la época
+    """
+    head, _, fraction = value.rstrip("Z").partition(".")
+    moment = datetime.fromisoformat(head).replace(tzinfo=timezone.utc)
+    return moment.timestamp() + (float(f"0.{fraction}") if fraction else 0.0)
+
+
+def create_transport(config, client, on_message, on_ready=None) -> Transport:
+    """
+    Crea el transporte indicado en la configuración.
+
+    Args:
+        config (BotConfig): Configuración del bot
+        client (twitchio.Client): Cliente IRC del bot (con ``eventsub`` solo
+            se usa su ``event_error`` para los errores de los mensajes)
+        on_message (Callable): Corrutina que recibe cada mensaje
+        on_ready (Optional[Callable]): Corrutina llamada al conectar
+
+    Returns:
+        Transport: Transporte configurado
+    """
+    if config.chat_transport == "eventsub":
+        return EventSubTransport(
+            config.token,
+            config.get_channels(),
+            on_message,
+            on_ready,
+            on_error=client.event_error,
+            ws_url=config.eventsub_ws_url,
+            api_url=config.twitch_api_url,
+            auth_url=config.twitch_auth_url,
+        )
+    return IrcTransport(client, on_message, on_ready)
@@ -14,13 +14,22 @@ Repositorio: https://github.com/llopgui/self-bot-twitch
 
 import asyncio
 import logging
-import random
-import re
+import os
+import signal
 import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 import twitchio
 
-from config import BotConfig
+from config import ENV_FILE, BotConfig
+from content import DEFAULT_FACTS, DEFAULT_JOKES, ContentRegistry
+from pipeline import MessageContext, build_default_pipeline
+from profiler import SamplingProfiler
+from selection import SelectionEngine
+from state import StateSnapshot
+from transports import ChatMessage, create_transport
 
 # Configurar encoding para Windows
 if sys.platform.startswith("win"):
@@ -33,6 +42,23 @@ if sys.platform.startswith("win"):
 # Configurar logging
 logger = logging.getLogger(__name__)
 
+# Espera máxima al volcado del perfilador al cerrar el bot (segundos)
+PROFILER_JOIN_TIMEOUT = 5
+
+# Opciones que solo se aplican al arrancar el bot
+RESTART_ONLY_FIELDS = {
+    "token",
+    "nick",
+    "state_file",
+    "use_uvloop",
+    "slow_callback_ms",
+    "chat_transport",
+    "eventsub_ws_url",
+    "twitch_api_url",
+    "twitch_auth_url",
+    "content_dir",
+}
+
 
 class AntiplotonianoBot(twitchio.Client):
     """
@@ -44,6 +70,9 @@ class AntiplotonianoBot(twitchio.Client):
     - Respuestas anti-Plutón cuando detecta menciones
     - Sistema de filtrado de bots
     - Logging de eventos
+    - Pipeline de mensajes por etapas con medición de tiempos
+    - Transporte de chat intercambiable (IRC o EventSub)
+    - Recuperación del estado tras un reinicio
     """
 
     def __init__(self, config: BotConfig):
@@ -62,234 +91,499 @@ class AntiplotonianoBot(twitchio.Client):
         # Guardar configuración
         self.config = config
 
-        # Cargar chistes malos desde archivo o usar por defecto
-        self.bad_jokes = self._load_bad_jokes()
+        # Chistes y factos por idioma y canal sobre un almacén compartido
+        self.content = self._load_content()
 
-        # Cargar factos anti-Plutón desde archivo o usar por defecto
-        self.anti_pluto_facts = self._load_anti_pluto_facts()
+        # Selección sin repeticiones por canal (solo guarda índices)
+        self.selector = SelectionEngine()
+        for view, size in self.content.view_sizes().items():
+            self.selector.register_pool(view, size)
 
         # Configurar el bucle de chistes automáticos
         self.joke_task = None
+        self._last_joke_at: float = time.time()
+
+        # Recuperar el estado de la ejecución anterior
+        self.snapshot = StateSnapshot(
+            config.state_file, config.state_snapshot_interval
+        )
+        restored = self.snapshot.load()
+        self.snapshot.register("chistes", self._get_joke_state, self._set_joke_state)
+        self.snapshot.register(
+            "rotaciones", self.selector.get_state, self.selector.set_state
+        )
+
+        # Pipeline de procesamiento de mensajes del chat
+        self.pipeline = build_default_pipeline(self)
+        self.stats_task = None
+
+        # Perfilador por muestreo (se activa bajo demanda)
+        self.profiler = SamplingProfiler(
+            interval=config.profiler_interval_ms / 1000,
+            window=config.profiler_window,
+            output_dir=config.profiler_dir,
+        )
+
+        # Transporte de chat (IRC de twitchio o EventSub)
+        self.transport = create_transport(
+            config, self, self.handle_message, self.on_transport_ready
+        )
+
+        # Recarga de configuración en caliente
+        self.watch_task = None
+        self._reload_lock = asyncio.Lock()
+        self._join_tasks: Set[asyncio.Task] = set()
+        self._closed = False
 
         # Log de inicio
-        logger.info(f"Bot inicializado para el canal: {config.channel}")
-        logger.info(f"Chistes cargados: {len(self.bad_jokes)}")
-        anti_pluto_count = len(self.anti_pluto_facts)
-        logger.info(f"Factos anti-Plutón cargados: {anti_pluto_count}")
+        channels = ", ".join(config.get_channels())
+        logger.info(f"Bot inicializado para los canales: {channels}")
+        logger.info(f"Transporte de chat: {self.transport.name}")
+        for view, size in sorted(self.content.view_sizes().items()):
+            logger.info(f"Contenido '{view}' cargado: {size}")
+        logger.info(f"Textos distintos en memoria: {len(self.content)}")
         logger.info(f"Bots ignorados: {len(self.config.ignored_bots)}")
         first_ten = self.config.get_ignored_bots_list()[:10]
         extra = "..." if len(self.config.ignored_bots) > 10 else ""
         logger.debug(f"Lista de bots ignorados: {first_ten}{extra}")
+        logger.info(f"Secciones de estado recuperadas: {restored}")
 
-    def _load_bad_jokes(self) -> list:
+    def _load_content(self) -> ContentRegistry:
         """
-        Carga chistes malos desde un archivo o usa una lista por defecto.
+        Carga los chistes y factos por defecto y, si se configura, los del
+        directorio CONTENT_DIR, que amplían o sustituyen a los anteriores.
 
         Returns:
-            list: Lista de chistes malos
-        """
-        default_jokes = [
-            "🎧 ¿Por qué Plutón no puede ser DJ? ¡Porque le quitaron el título!",
-            "📞 ¿Cómo llama Plutón a sus amigos? ¡Planetarios perdidos!",
-            "📝 ¿Por qué Plutón reprobó el examen? ¡Porque no clasificó!",
-            "🌍 ¿Qué le dijo Plutón a la Tierra? «Eres un planeta insoportable».",
-            "⚽ ¿Por qué Plutón no juega fútbol? ¡Porque siempre lo sacan por falta de categoría!",
-            "🛡️ ¿Cómo se defiende Plutón en el espacio? «¡Soy enano, pero con clase!».",
-            "🪐 ¿Qué le dijo Júpiter a Plutón? «Deja de orbitar mis problemas».",
-            "🎉 ¿Por qué Plutón no entra en la lista de invitados? ¡Porque lo degradaron a plus-one!",
-            "🎵 ¿Qué música escucha Plutón? ¡Coldplay-to!",
-            "💪 ¿Por qué Plutón no va al gimnasio? ¡Por más que entrena, sigue siendo enano!",
-            "😢 ¿Qué hace Plutón cuando está triste? ¡Se pone a planetar su soledad!",
-            "🕵️ ¿Por qué Plutón es el mejor espía? ¡Porque todos pasan sin notarlo!",
-            "🔭 ¿Qué le dijo un telescopio a Plutón? «Eres pequeño, pero brillas en la oscuridad».",
-            "⭐ ¿Cómo pide Plutón un deseo? «¡Que la IAU me reclasifique!»",
-            "🗺️ ¿Por qué Plutón no usa GPS? ¡Porque siempre está fuera del mapa!",
-            "☀️ ¿Qué le dijo el Sol a Plutón? «Deja de darme vueltas, ¡que me mareas!».",
-            "📖 ¿Por qué Plutón es buen poeta? ¡Porque escribe versos enanos!",
-            "🎓 ¿Qué estudia Plutón en la universidad? ¡Astrología dwarf!",
-            "👋 ¿Cómo se despiden en Plutón? «¡Nos orbitamos pronto!».",
-            "🌙 ¿Qué le dijo la Luna a Plutón? «No te sientas mal... ¡yo tampoco soy planeta!»",
-            "🍕 ¿Por qué Plutón no puede pedir pizza? ¡Porque no está en el área de entrega!",
-            "💼 ¿Qué pone Plutón en su CV? «Ex-planeta con experiencia en el espacio».",
-            "🎮 ¿Por qué Plutón no juega videojuegos? ¡Porque siempre lo sacan del lobby!",
-            "☎️ ¿Qué dice Plutón cuando contesta el teléfono? «¿Aló? ¿Siguen ahí mis derechos planetarios?»",
-            "🎭 ¿Por qué Plutón es buen actor? ¡Porque domina el papel de marginado!",
-            "🏠 ¿Dónde vive Plutón? ¡En el barrio de los planetas enanos!",
-            "🎪 ¿Por qué Plutón no va al circo? ¡Porque él ya es el show de los enanos!",
-            "🧠 ¿Qué piensa Plutón antes de dormir? «Mañana seré planeta... ¡otra vez!»",
-            "🎂 ¿Cómo celebra Plutón su cumpleaños? ¡Cada 248 años terrestres!",
-            "🚗 ¿Por qué Plutón no maneja? ¡Porque su órbita es muy excéntrica!",
-        ]
-        # En el futuro se puede cargar desde un archivo
-        return default_jokes
+            ContentRegistry: Registro de contenido
 
-    def _load_anti_pluto_facts(self) -> list:
+        Raises:
+            ValueError: Si el idioma por defecto no tiene chistes o factos
         """
-        Carga datos anti-Plutón desde un archivo o usa una lista por defecto.
+        content = ContentRegistry(self.config.default_language)
+        defaults = {"chistes": DEFAULT_JOKES, "factos": DEFAULT_FACTS}
+        for pool, by_language in defaults.items():
+            for language, items in by_language.items():
+                content.add_pool(pool, language, items)
+
+        if self.config.content_dir:
+            loaded = content.load_directory(self.config.content_dir)
+            logger.info(f"Contenido adicional cargado: {', '.join(loaded) or 'nada'}")
+
+        self._check_default_language(content, self.config)
+        content.set_channel_languages(self.config.channel_languages)
+        return content
+
+    @staticmethod
+    def _check_default_language(content: ContentRegistry, config: BotConfig) -> None:
+        """
+        Comprueba que el idioma por defecto tenga chistes y factos.
 
-        Returns:
-            list: Lista de factos científicos contra Plutón
-        """
-        default_facts = [
-            "🌌 FACTO: Plutón no ha limpiado su órbita de otros objetos. ¡Su vecindario está lleno de cuerpos del Cinturón de Kuiper!",
-            "📊 FACTO: La IAU reclasificó Plutón como planeta enano en 2006. ¡Una decisión que causó controversia mundial!",
-            "🛸 FACTO: Plutón comparte órbita con otros objetos celestes. ¡Los planetas dominan solitarios sus órbitas!",
-            "📏 FACTO: Es más pequeño que nuestra Luna. ¡Solo tiene 2,370 km de diámetro!",
-            "⚖️ FACTO: Su masa es apenas el 0.2% de la masa terrestre. ¡Ni siquiera es el más masivo de los planetas enanos!",
-            "🔢 FACTO: Existen 5 planetas enanos reconocidos: Plutón, Eris, Ceres, Makemake y Haumea. ¡Plutón es uno más!",
-            "🌊 FACTO: La gravedad de Neptuno influye en Plutón. ¡Su órbita es caótica por esta interacción!",
-            "⚡ FACTO: Eris es más masivo que Plutón. ¡Su descubrimiento impulsó la reclasificación!",
-            "📐 FACTO: Órbita inclinada 17° sobre la eclíptica. ¡Los planetas tienen órbitas casi planas!",
-            "🎯 FACTO: Su órbita es excéntrica y elíptica. ¡Cruza la órbita de Neptuno!",
-            "🔍 FACTO: Forma parte del Cinturón de Kuiper. ¡Es uno de sus objetos más brillantes!",
-            "📋 FACTO: No cumple el tercer criterio planetario. 'Limpiar su órbita' es clave según la IAU.",
-            "🎱 FACTO: Solo 8 cuerpos cumplen todos los criterios: De Mercurio a Neptuno, según la IAU.",
-            "🚧 FACTO: Comparte zona con otros objetos transneptunianos. ¡Su 'barrio' orbital está congestionado!",
-            "📦 FACTO: Su tamaño es inferior a 7 lunas del sistema solar. ¡Ganímedes, Titán y otras son mayores!",
-            "🚀 FACTO: La sonda New Horizons reveló su complejidad. ¡Pero su geología no cambió su estatus!",
-            "🔄 FACTO: Ceres fue reclasificado igual en 2006: ¡De asteroide a planeta enano!",
-            "🌙 FACTO: Plutón tiene 5 lunas conocidas. ¡Caronte es casi tan grande como él!",
-            "🎪 FACTO: La definición excluye cuerpos en discos densos. ¡El Cinturón de Kuiper califica como tal!",
-            "🔬 FACTO: Alan Stern propuso definición geofísica. ¡Pero la IAU mantiene criterios dinámicos!",
-            "🗳️ FACTO: Solo 1% de astrónomos votó en 2006. ¡424 expertos decidieron su destino!",
-            "⏰ FACTO: Su órbita tarda 248 años terrestres. ¡Y nunca completó una desde su descubrimiento!",
-            "👑 FACTO: No es el objeto más grande del Cinturón. ¡Eris y Plutón son casi gemelos!",
-            "💪 FACTO: Planetas dominan gravitacionalmente su zona. ¡Plutón es influenciado por Neptuno!",
-            "🌬️ FACTO: Su atmósfera colapsa y revive estacionalmente. ¡Pero esto no afecta su clasificación!",
-            "🏔️ FACTO: Tiene montañas de hielo de agua. ¡Complejidad ≠ definición planetaria!",
-            "⚙️ FACTO: La IAU usa criterios dinámicos, no geológicos. ¡Importa su interacción orbital!",
-            "☄️ FACTO: Si estuviera cerca del Sol, sería cometa. ¡Sus hielos se sublimarían!",
-            "📊 FACTO: Existen +1,200 objetos similares en el Cinturón. ¡Clasificarlos como planetas sería caótico!",
-            "📅 FACTO: Descubierto en 1930, fue planeta 76 años. ¡El más breve de la historia!",
-            "📚 FACTO: Su nombre ya no está en listas planetarias. ¡Los libros de texto se actualizaron!",
-            "🤔 FACTO: Algunos científicos rechazan la definición. ¡El debate continúa hoy!",
-            "🪶 FACTO: La gravedad plutoniana es muy débil. ¡6 veces menor que la lunar!",
-            "🌘 FACTO: Planetas enanos pueden tener lunas y atmósfera. ¡Pero no son planetas según la IAU!",
-            "⏳ FACTO: Si limpiara su órbita, sería planeta. ¡Pero le tomaría billones de años!",
-            "🧊 FACTO: Está compuesto principalmente de hielo y roca. ¡Densidad de solo 1.9 g/cm³!",
-            "🌡️ FACTO: Temperatura superficial de -230°C. ¡Demasiado frío para actividad geológica activa!",
-            "🔭 FACTO: Tomó 76 años descubrir que tenía lunas. ¡Caronte fue encontrada en 1978!",
-            "🎭 FACTO: Plutón y Caronte forman sistema binario. ¡Ambos orbitan un punto común!",
-            "💫 FACTO: Su brillo varía por rotación y composición. ¡6.4 días terrestres por rotación!",
-            "🎪 FACTO: Pertenece a la familia de plutinos. ¡Objetos en resonancia 2:3 con Neptuno!",
-            "🌀 FACTO: Su órbita es resonante con Neptuno. ¡2 órbitas de Plutón = 3 de Neptuno!",
-            "📡 FACTO: New Horizons tardó 9 años en llegar. ¡Y solo pudo estudiarlo por horas!",
-            "🎨 FACTO: Su superficie tiene variaciones de color. ¡Desde beige hasta rojizo por metano!",
-            "⚗️ FACTO: Atmósfera de nitrógeno, metano y CO. ¡Pero 100,000 veces más tenue que la terrestre!",
-            "🏁 FACTO: Es el último 'planeta' descubierto. ¡Después solo se han encontrado planetas enanos!",
-            "🎯 FACTO: Su órbita lo acerca más que Neptuno al Sol. ¡Entre 1979-1999 fue el octavo!",
-            "🔄 FACTO: Acoplamiento de marea con Caronte. ¡Siempre muestran la misma cara!",
-            "⭐ FACTO: Walt Disney lo nombró como su perro. ¡Mismo año del descubrimiento: 1930!",
-            "🧮 FACTO: Su masa es 6 veces menor que la Luna. ¡Y 400 veces menor que la Tierra!",
-            "🔍 FACTO: Se necesitó el telescopio Hubble. ¡Para resolver sus lunas más pequeñas!",
-            "🌪️ FACTO: No tiene campo magnético detectable. ¡A diferencia de los planetas rocosos!",
-            "🎲 FACTO: Fue descubierto por accidente. ¡Buscando el hipotético Planeta X!",
-            "📐 FACTO: Su eje de rotación está inclinado 122°. ¡Rota casi de costado como Urano!",
-            "🌊 FACTO: Podría tener océano subsuperficial. ¡Pero eso no lo hace planeta!",
-            "🎪 FACTO: Es miembro del club de los KBO. ¡Kuiper Belt Objects, no planetas!",
-            "⚖️ FACTO: La decisión de la IAU fue democrática. ¡Votación científica, no política!",
-            "🏆 FACTO: Mantiene récord de excentricidad orbital. ¡Entre todos los explanetas del sistema!",
-            "🔬 FACTO: Su estudio ayudó a definir 'planeta'. ¡Ironía: contribuyó a su propia reclasificación!",
-            "🎯 FACTO: Es el prototipo de planeta enano. ¡Definió toda una nueva categoría!",
-            "📊 FACTO: Solo 0.07% del tamaño de la Tierra. ¡Más pequeño que Australia!",
-            "🌌 FACTO: Está en la frontera del sistema solar. ¡Donde comienza el espacio interestelar!",
-            "🎪 FACTO: Representa la transición histórica. ¡De 9 a 8 planetas oficiales!",
-            "🚫 FACTO: Plutón NO es un planeta desde 2006. Es un planeta enano.",
-            "🌕 FACTO: La luna de la Tierra es más grande que Plutón.",
-            "📏 FACTO: Plutón mide solo 2,374 km de diámetro. ¡Minúsculo!",
-        ]
-        # En el futuro se puede cargar desde un archivo
-        return default_facts
+        Args:
+            content (ContentRegistry): Registro de contenido
+            config (BotConfig): Configuración a comprobar
 
-    async def event_ready(self):
+        Raises:
+            ValueError: Si falta algún pool en el idioma por defecto
         """
-        Evento que se ejecuta cuando el bot se conecta exitosamente.
+        for pool in ("chistes", "factos"):
+            if not content.has_view(pool, config.default_language):
+                raise ValueError(
+                    f"DEFAULT_LANGUAGE '{config.default_language}' no tiene {pool}"
+                )
+
+    async def on_transport_ready(self):
+        """
+        Se ejecuta cuando el transporte de chat se conecta (o reconecta)
+        exitosamente.
         """
-        logger.info(f"Bot conectado como: {self.nick}")
+        logger.info(f"Bot conectado mediante {self.transport.name}")
 
         # Iniciar bucle de chistes automáticos
         if not self.joke_task:
             self.joke_task = self.loop.create_task(self._joke_loop())
             logger.info("Bucle de chistes automáticos iniciado")
 
-    async def event_message(self, message):
+        # Iniciar instantáneas periódicas del estado
+        self.snapshot.start()
+
+        # Iniciar informes de tiempos del pipeline
+        self._start_stats_loop()
+
+        # Vigilar el archivo .env para recargar la configuración
+        self._start_watch_loop()
+
+    async def handle_message(self, message: ChatMessage):
         """
-        Evento que se ejecuta cuando se recibe un mensaje en el chat.
-        Detecta menciones de Plutón y responde con factos.
-        Ignora mensajes de otros bots según la configuración.
+        Se ejecuta cuando el transporte recibe un mensaje del chat.
+        Pasa el mensaje por el pipeline de etapas (filtrado, normalización,
+        detección de Plutón, enfriamiento y respuesta).
 
         Args:
-            message: Mensaje recibido del chat
+            message (ChatMessage): Mensaje recibido del chat
         """
-        # Evitar que el bot responda a sus propios mensajes
-        if message.echo:
-            return
+        await self.pipeline.run(MessageContext(message))
 
-        # Obtener información del autor del mensaje
-        author_name = message.author.name
-        if not author_name:
-            return
+    async def serve(self):
+        """
+        Conecta el transporte de chat y procesa mensajes hasta que se cierre.
+        """
+        await self.transport.run()
+
+    def _start_stats_loop(self) -> None:
+        """Inicia el bucle de estadísticas del pipeline si está activo."""
+        if (
+            self.pipeline.timing
+            and self.config.pipeline_stats_interval > 0
+            and not self.stats_task
+        ):
+            self.stats_task = self.loop.create_task(self._stats_loop())
+
+    def _start_watch_loop(self) -> None:
+        """Inicia la vigilancia del archivo .env si está activa."""
+        interval = self.config.config_watch_interval
+        if ENV_FILE and interval > 0 and not self.watch_task:
+            self.watch_task = self.loop.create_task(self._config_watch_loop())
+
+    async def _stats_loop(self):
+        """
+        Bucle asíncrono que registra periódicamente el coste de cada etapa
+        del pipeline.
+        """
+        try:
+            while True:
+                await asyncio.sleep(self.config.pipeline_stats_interval)
+                for line in self.pipeline.stats_summary():
+                    logger.info(f"Pipeline {line}")
+        except asyncio.CancelledError:
+            logger.info("Bucle de estadísticas del pipeline cancelado")
 
-        # Verificar si debemos ignorar este usuario (bots, etc.)
-        if self.config.is_ignored_user(author_name):
-            logger.debug(f"Ignorando mensaje del bot: {author_name}")
-            return
+    async def _joke_loop(self):
+        """
+        Bucle asíncrono que envía chistes automáticamente en intervalos.
+        """
+        try:
+            while True:
+                # Esperar el intervalo configurado, descontando el tiempo
+                # transcurrido desde el último chiste (también si se envió
+                # antes de un reinicio)
+                elapsed = time.time() - self._last_joke_at
+                await asyncio.sleep(max(0.0, self.config.message_interval - elapsed))
+
+                # Enviar a cada canal el siguiente chiste de su rotación
+                for name in self.config.get_channels():
+                    joke = self.choose_content(name, "chistes")
+                    if await self.transport.send(name, joke):
+                        logger.info(f"Chiste automático enviado a {name}")
+                    else:
+                        logger.warning(
+                            f"No se pudo enviar el chiste a {name} "
+                            f"(canal no disponible o mensaje rechazado)"
+                        )
+
+                self._last_joke_at = time.time()
+                self.snapshot.mark_dirty("chistes")
 
-        # Obtener contenido del mensaje
-        content = message.content
-        if not content:
-            return
+        except asyncio.CancelledError:
+            logger.info("Bucle de chistes automáticos cancelado")
+        except Exception as e:
+            logger.error(f"Error en bucle de chistes: {e}")
 
-        # Log del mensaje recibido (solo para usuarios no ignorados)
-        logger.debug(f"Mensaje de {author_name}: {content}")
+    def choose_content(self, channel: str, pool: str) -> str:
+        """
+        Elige el siguiente elemento de un pool de contenido para un canal,
+        sin repetir hasta haber recorrido el pool. El pool depende del
+        idioma del canal (o de su contenido propio, si lo tiene).
 
-        # Detectar menciones de Plutón (case insensitive)
-        pluto_patterns = [
-            r"\bpluton\b",
-            r"\bpluto\b",
-            r"\bplanet[ao]?\s+pluton\b",
-            r"\bplanet[ao]?\s+pluto\b",
-        ]
+        Args:
+            channel (str): Nombre del canal
+            pool (str): Nombre del pool ("chistes" o "factos")
 
-        mensaje_lower = content.lower()
-        pluto_mentioned = any(
-            re.search(pattern, mensaje_lower) for pattern in pluto_patterns
-        )
+        Returns:
+            str: Texto elegido
+        """
+        view = self.content.resolve(channel, pool)
+        index = self.selector.choose(channel, view)
+        self.snapshot.mark_dirty("rotaciones")
+        return self.content.get(view, index)
 
-        if pluto_mentioned:
-            # Seleccionar un facto aleatorio
-            facto = random.choice(self.anti_pluto_facts)
+    def toggle_profiler(self) -> bool:
+        """
+        Activa o desactiva el perfilador por muestreo.
 
-            # Responder al usuario
-            await message.channel.send(f"@{author_name} {facto}")
+        Se llama al recibir SIGUSR1 y puede usarse como gancho de
+        administración desde otros componentes.
 
-            logger.info(f"Respondido a {author_name} con facto anti-Plutón")
+        Returns:
+            bool: True si el perfilador ha quedado activo
+        """
+        active = self.profiler.toggle()
+        logger.info(f"Perfilador {'activado' if active else 'desactivado'}")
+        return active
 
-    async def _joke_loop(self):
+    def install_signal_handlers(self) -> None:
         """
-        Bucle asíncrono que envía chistes automáticamente en intervalos.
+        Instala los manejadores de señales del bot en el bucle de eventos.
+        No hace nada en plataformas sin señales POSIX (Windows).
+        """
+        loop = asyncio.get_running_loop()
+        if hasattr(signal, "SIGUSR1"):
+            loop.add_signal_handler(signal.SIGUSR1, self.toggle_profiler)
+        if hasattr(signal, "SIGHUP"):
+            loop.add_signal_handler(
+                signal.SIGHUP, lambda: loop.create_task(self.reload_config())
+            )
+
+    async def reload_config(self) -> bool:
+        """
+        Vuelve a leer la configuración y aplica solo lo que ha cambiado,
+        sin reconectar. La lectura y validación se hacen en un hilo para
+        no detener el procesamiento de mensajes.
+
+        Returns:
+            bool: True si se aplicó una configuración nueva
+        """
+        async with self._reload_lock:
+            loop = asyncio.get_running_loop()
+            try:
+                new_config = await loop.run_in_executor(None, BotConfig.reload)
+                self._check_default_language(self.content, new_config)
+            except (OSError, ValueError) as e:
+                logger.error(f"Configuración no válida, se mantiene la actual: {e}")
+                return False
+
+            changed = self.config.diff(new_config)
+            if not changed:
+                logger.info("Configuración recargada sin cambios")
+                return False
+
+            if not await self._apply_config(new_config, changed):
+                return False
+            logger.info(f"Configuración recargada: {', '.join(changed)}")
+            return True
+
+    async def _apply_config(self, new_config: BotConfig, changed: List[str]) -> bool:
+        """
+        Aplica una configuración nueva ya validada.
+
+        Los valores que se leen en cada mensaje (bots ignorados,
+        enfriamiento...) cambian al sustituir ``self.config``; el resto se
+        aplica a las tareas y componentes afectados. Si no se puede salir
+        de los canales eliminados se mantiene la configuración actual, para
+        que coincida con los canales a los que sigue unido el bot.
+
+        Args:
+            new_config (BotConfig): Configuración nueva
+            changed (List[str]): Atributos que cambian
+
+        Returns:
+            bool: True si se sustituyó la configuración
         """
+        old_config = self.config
+
+        # Las opciones que solo se aplican al arrancar conservan el valor en
+        # uso, para que la configuración describa lo que está funcionando y
+        # la próxima recarga vuelva a avisar del cambio pendiente
+        for name in sorted(RESTART_ONLY_FIELDS.intersection(changed)):
+            logger.warning(f"El cambio de '{name}' requiere reiniciar el bot")
+            setattr(new_config, name, getattr(old_config, name))
+
+        joined: List[str] = []
+        if "channels" in changed:
+            old_channels = set(old_config.get_channels())
+            new_channels = set(new_config.get_channels())
+            joined = sorted(new_channels - old_channels)
+            parted = sorted(old_channels - new_channels)
+            if parted:
+                try:
+                    await self.transport.part(parted)
+                except Exception as e:
+                    logger.error(
+                        f"Error saliendo de los canales, se mantiene la "
+                        f"configuración actual: {e}"
+                    )
+                    return False
+                logger.info(f"Saliendo de los canales: {', '.join(parted)}")
+
+        self.config = new_config
+
         try:
-            while True:
-                # Esperar el intervalo configurado
-                await asyncio.sleep(self.config.message_interval)
+            self._apply_side_effects(new_config, changed, joined)
+        except Exception as e:
+            logger.error(f"Error aplicando la configuración nueva: {e}")
+        if "state_snapshot_interval" in changed:
+            try:
+                await self.snapshot.stop()
+            except Exception as e:
+                logger.error(f"Error deteniendo las instantáneas de estado: {e}")
+            self.snapshot.interval = new_config.state_snapshot_interval
+            self.snapshot.start()
+        return True
+
+    def _apply_side_effects(
+        self, new_config: BotConfig, changed: List[str], joined: List[str]
+    ) -> None:
+        """
+        Aplica a las tareas y componentes del bot los cambios que no
+        necesitan esperar.
+
+        Args:
+            new_config (BotConfig): Configuración nueva
+            changed (List[str]): Atributos que cambian
+            joined (List[str]): Canales a los que hay que unirse
+        """
+        if joined:
+            # Unirse respeta el límite de Twitch; no esperar a que acabe
+            task = self.loop.create_task(self.transport.join(joined))
+            self._join_tasks.add(task)
+            task.add_done_callback(self._on_join_done)
+            logger.info(f"Uniéndose a los canales: {', '.join(joined)}")
+
+        if "message_interval" in changed and self.joke_task:
+            # El bucle nuevo descuenta el tiempo desde el último chiste
+            self.joke_task.cancel()
+            self.joke_task = self.loop.create_task(self._joke_loop())
+
+        if {"pipeline_timing", "pipeline_stats_interval"}.intersection(changed):
+            self.pipeline.timing = new_config.pipeline_timing
+            if self.stats_task:
+                self.stats_task.cancel()
+                self.stats_task = None
+            self._start_stats_loop()
+
+        if "default_language" in changed:
+            self.content.default_language = new_config.default_language
+        if {"default_language", "channel_languages"}.intersection(changed):
+            channels = set(self.config.channels) | set(new_config.channels)
+            before = self._resolve_views(channels)
+            self.content.set_channel_languages(new_config.channel_languages)
+            self._forget_rotations(before, self._resolve_views(channels))
+
+        self.profiler.interval = new_config.profiler_interval_ms / 1000
+        self.profiler.window = new_config.profiler_window
+        self.profiler.output_dir = Path(new_config.profiler_dir)
+
+        # La vigilancia del .env lee el intervalo en cada vuelta y se detiene
+        # sola si pasa a 0; aquí solo se inicia si estaba parada
+        self._start_watch_loop()
+
+    def _resolve_views(self, channels: Iterable[str]) -> Dict[Tuple[str, str], str]:
+        """
+        Obtiene la vista de chistes y factos de cada canal.
+
+        Args:
+            channels (Iterable[str]): Nombres de los canales
+
+        Returns:
+            Dict[Tuple[str, str], str]: Vista por (canal, pool)
+        """
+        return {
+            (channel, pool): self.content.resolve(channel, pool)
+            for channel in channels
+            for pool in ("chistes", "factos")
+        }
+
+    def _forget_rotations(
+        self,
+        before: Dict[Tuple[str, str], str],
+        after: Dict[Tuple[str, str], str],
+    ) -> None:
+        """
+        Descarta las rotaciones de las vistas que los canales han dejado de
+        usar, para que no se queden para siempre en la instantánea.
+
+        Args:
+            before (Dict[Tuple[str, str], str]): Vistas antes del cambio
+            after (Dict[Tuple[str, str], str]): Vistas después del cambio
+        """
+        forgotten = [
+            (channel, view)
+            for (channel, pool), view in before.items()
+            if after.get((channel, pool)) != view
+            and self.selector.forget(channel, view)
+        ]
+        if forgotten:
+            self.snapshot.mark_dirty("rotaciones")
+            logger.info(
+                f"Rotaciones descartadas por cambio de idioma: {len(forgotten)}"
+            )
 
-                # Seleccionar un chiste aleatorio
-                joke = random.choice(self.bad_jokes)
+    def _on_join_done(self, task: asyncio.Task) -> None:
+        """
+        Registra el resultado de una tarea de unión a canales.
 
-                # Enviar al canal
-                channel = self.get_channel(self.config.channel)
-                if channel:
-                    await channel.send(joke)
-                    logger.info("Chiste automático enviado")
-                else:
-                    canal_msg = f"No se pudo encontrar el canal: {self.config.channel}"
-                    logger.warning(canal_msg)
+        Args:
+            task (asyncio.Task): Tarea terminada
+        """
+        self._join_tasks.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error(f"Error uniéndose a los canales: {error}")
 
+    async def _config_watch_loop(self):
+        """
+        Bucle asíncrono que recarga la configuración cuando cambia la
+        fecha de modificación del archivo .env.
+        """
+        try:
+            last_mtime = os.stat(ENV_FILE).st_mtime_ns
+            while self.config.config_watch_interval > 0:
+                await asyncio.sleep(self.config.config_watch_interval)
+                try:
+                    mtime = os.stat(ENV_FILE).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                if mtime != last_mtime:
+                    last_mtime = mtime
+                    await self.reload_config()
         except asyncio.CancelledError:
-            logger.info("Bucle de chistes automáticos cancelado")
+            logger.info("Vigilancia de la configuración cancelada")
         except Exception as e:
-            logger.error(f"Error en bucle de chistes: {e}")
+            logger.error(f"Error vigilando la configuración: {e}")
+        finally:
+            self.watch_task = None
+
+    def _get_joke_state(self) -> dict:
+        """
+        Obtiene el estado del bucle de chistes para la instantánea.
+
+        Returns:
+            dict: Estado serializable del bucle de chistes
+        """
+        return {"ultimo_envio": self._last_joke_at}
+
+    def _set_joke_state(self, state: dict) -> None:
+        """
+        Restaura el estado del bucle de chistes desde la instantánea.
+
+        Args:
+            state (dict): Estado guardado del bucle de chistes
+        """
+        self._last_joke_at = float(state.get("ultimo_envio", self._last_joke_at))
+
+    async def close(self):
+        """
+        Cierra el bot guardando antes una última instantánea del estado.
+        Las llamadas posteriores no hacen nada.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self.joke_task:
+            self.joke_task.cancel()
+        if self.stats_task:
+            self.stats_task.cancel()
+        if self.watch_task:
+            self.watch_task.cancel()
+        for task in list(self._join_tasks):
+            task.cancel()
+        # Esperar a que una captura en curso escriba su volcado
+        self.profiler.stop()
+        if not await asyncio.to_thread(self.profiler.join, PROFILER_JOIN_TIMEOUT):
+            logger.warning("El perfilador no terminó a tiempo; se pierde la captura")
+        await self.snapshot.stop()
+        await self.transport.close()
 
     async def event_error(self, error, data):
         """
@@ -303,27 +597,88 @@ class AntiplotonianoBot(twitchio.Client):
         logger.debug(f"Datos del error: {data}")
 
 
-async def main():
+async def main(config: Optional[BotConfig] = None):
     """
     Función principal que inicializa y ejecute el bot.
+
+    Args:
+        config (Optional[BotConfig]): Configuración ya cargada (si no se
+            indica, se lee de las variables de entorno)
     """
+    bot = None
     try:
         # Cargar configuración
-        config = BotConfig()
+        if config is None:
+            config = BotConfig()
 
         # Crear el bot
         bot = AntiplotonianoBot(config)
+        bot.install_signal_handlers()
 
         # Ejecutar el bot
         logger.info("Iniciando bot...")
-        await bot.start()
+        await bot.serve()
 
     except KeyboardInterrupt:
         logger.info("Bot detenido por el usuario")
     except Exception as e:
         logger.error(f"Error al ejecutar el bot: {e}")
         raise
+    finally:
+        # Cerrar el bot (detiene las instantáneas periódicas y guarda la
+        # última); si falla, guardar el estado directamente
+        if bot is not None:
+            try:
+                await bot.close()
+            except Exception as e:
+                logger.error(f"Error cerrando el bot: {e}")
+            bot.snapshot.save_sync()
+
+
+def _event_loop_factory(config: BotConfig) -> Optional[Callable]:
+    """
+    Elige la fábrica de bucles de eventos según la configuración.
+
+    Args:
+        config (BotConfig): Configuración del bot
+
+    Returns:
+        Optional[Callable]: ``uvloop.new_event_loop`` si se pidió y está
+        disponible, o None para usar el bucle por defecto de asyncio
+    """
+    if not config.use_uvloop:
+        return None
+
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("USE_UVLOOP activo pero uvloop no está instalado")
+        return None
+
+    logger.info("Usando uvloop como bucle de eventos")
+    return uvloop.new_event_loop
+
+
+def run():
+    """
+    Punto de entrada síncrono: prepara el bucle de eventos (uvloop y
+    detección de callbacks lentos según la configuración) y ejecuta el bot.
+    """
+    try:
+        config = BotConfig()
+    except Exception as e:
+        logger.error(f"Error al ejecutar el bot: {e}")
+        raise
+
+    debug = config.slow_callback_ms > 0
+    with asyncio.Runner(
+        debug=debug, loop_factory=_event_loop_factory(config)
+    ) as runner:
+        if debug:
+            # asyncio registra como aviso cada callback que supere el umbral
+            runner.get_loop().slow_callback_duration = config.slow_callback_ms / 1000
+        runner.run(main(config))
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run()